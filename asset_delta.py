@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Binary Delta Patches for Game Assets
+Ships a translation as a list of (offset, old bytes, new bytes) records
+instead of a full patched .assets file: KBs instead of hundreds of MB.
+
+File layout (.dvdelta):
+    magic     b"DVDELTA2"
+    header    source size u64, source sha256[32], target size u64,
+              target sha256[32], record count u32, payload size u32
+    payload   zlib( records: source offset u64, old length u32,
+                    new length u32, old[old length], new[new length] )
+
+Everything between records is implicitly copied from the source, so old
+and new may differ in length: a string that grew by 12 bytes costs one
+small record, not a copy of the shifted rest of the file. make_delta()
+finds where the two versions line up again after each difference by
+probing the patched bytes in a growing window of the original
+(bytes.find), and extends equal runs with C-level compares.
+
+Same-length deltas are applied in place touching only the record ranges,
+and ranges that already hold the new bytes are skipped, so an interrupted
+apply can simply be re-run. On that path the base is only checked by size
+and by the old bytes of every record (O(delta)): bytes outside the records
+are not looked at unless full_verify first hashes the file as it would be
+after patching and compares it with the target sha256. Deltas that change lengths rewrite
+the file once into a temp file, which is hashed as it is written and only
+replaces the original if it matches the target sha256. The old bytes make
+every delta revertible. DVDELTA1 files (same-offset records) are still
+read.
+
+The CLI verifies the whole file by default; --quick skips the hashing.
+
+Usage:
+    python asset_delta.py make <original> <patched> <out.dvdelta>
+    python asset_delta.py apply <patch.dvdelta> <file> [--quick]
+    python asset_delta.py revert <patch.dvdelta> <file> [--quick]
+    python asset_delta.py info <patch.dvdelta>
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import sys
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+MAGIC = b"DVDELTA2"
+MAGIC_V1 = b"DVDELTA1"
+HEADER = struct.Struct("<Q32sQ32sII")
+RECORD = struct.Struct("<QII")
+RECORD_V1 = struct.Struct("<QI")
+COPY_BLOCK = 1024 * 1024
+MERGE_GAP = 8       # join records separated by fewer equal bytes than this
+PROBE = 16          # bytes of the patched file looked up in the original
+MIN_MATCH = 32      # equal bytes needed to accept a realignment
+SEARCH_WINDOWS = (256, 4096, 65536, 1024 * 1024)
+PROBES_PER_WINDOW = 64
+
+Record = Tuple[int, bytes, bytes]
+
+
+class DeltaError(Exception):
+    pass
+
+
+# ── diffing ────────────────────────────────────────────────────────────
+
+def _match_length(a: bytes, b: memoryview, i: int, j: int) -> int:
+    """Length of the equal run starting at a[i] / b[j]: galloping compares,
+    then a bisection inside the first block that differs"""
+    n = min(len(a) - i, len(b) - j)
+    length, step = 0, 64
+    while length < n:
+        end = min(length + step, n)
+        if a.startswith(b[j + length:j + end], i + length):
+            length = end
+            step = min(step * 2, COPY_BLOCK)
+            continue
+        lo, hi = length, end    # a[i+lo:] and b[j+lo:] differ before hi
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if a.startswith(b[j + lo:j + mid], i + lo):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+    return n
+
+
+def _resync(a: bytes, b: memoryview, i: int, j: int) -> Tuple[int, int]:
+    """Nearest (x, y) past a difference at (i, j) where a[x:] and b[y:] agree
+    for MIN_MATCH bytes; replaces/inserts/deletes are all a shift of x vs y"""
+    for window in SEARCH_WINDOWS:
+        best = None
+        step = max(PROBE, window // PROBES_PER_WINDOW)
+        for g in range(0, min(window, len(b) - j - PROBE + 1), step):
+            y = j + g
+            x = a.find(b[y:y + PROBE], i, min(len(a), i + window + g + PROBE))
+            if x < 0:
+                continue
+            # Walk back to where the equal run really starts
+            floor = min(x - i, g)
+            back = 0
+            while back < floor and a[x - back - 1] == b[y - back - 1]:
+                back += 1
+            x, y = x - back, y - back
+            if (x, y) != (i, j) and _match_length(a, b, x, y) >= MIN_MATCH:
+                cost = (x - i) + (y - j)
+                if best is None or cost < best[0]:
+                    best = (cost, x, y)
+        if best is not None:
+            return best[1], best[2]
+    # Nothing lines up nearby: treat the next window as replaced
+    window = SEARCH_WINDOWS[-1]
+    return min(len(a), i + window), min(len(b), j + window)
+
+
+def diff_records(original: bytes, patched: bytes) -> List[Record]:
+    """(source offset, old, new) records turning original into patched"""
+    a, b = bytes(original), memoryview(patched)
+    records: List[Record] = []
+
+    def add(offset: int, old: bytes, new: bytes) -> None:
+        if records:
+            prev_offset, prev_old, prev_new = records[-1]
+            gap = offset - (prev_offset + len(prev_old))
+            if gap < MERGE_GAP:
+                equal = a[offset - gap:offset]
+                records[-1] = (prev_offset, prev_old + equal + old, prev_new + equal + new)
+                return
+        records.append((offset, old, new))
+
+    i = j = 0
+    while True:
+        run = _match_length(a, b, i, j)
+        i, j = i + run, j + run
+        if i >= len(a) or j >= len(b):
+            if i < len(a) or j < len(b):
+                add(i, a[i:], bytes(b[j:]))
+            return records
+        x, y = _resync(a, b, i, j)
+        add(i, a[i:x], bytes(b[j:y]))
+        i, j = x, y
+
+
+def make_delta(original: bytes, patched: bytes) -> bytes:
+    """Build a .dvdelta from two in-memory versions of a file"""
+    records = diff_records(original, patched)
+    payload = bytearray()
+    for offset, old, new in records:
+        payload += RECORD.pack(offset, len(old), len(new))
+        payload += old
+        payload += new
+    compressed = zlib.compress(bytes(payload), 9)
+
+    header = HEADER.pack(len(original), hashlib.sha256(original).digest(),
+                         len(patched), hashlib.sha256(patched).digest(),
+                         len(records), len(compressed))
+    return MAGIC + header + compressed
+
+
+def make_delta_files(original_path: str, patched_path: str, out_path: str) -> Dict:
+    with open(original_path, "rb") as f:
+        original = f.read()
+    with open(patched_path, "rb") as f:
+        patched = f.read()
+    delta = make_delta(original, patched)
+    with open(out_path, "wb") as f:
+        f.write(delta)
+    return read_header(delta)
+
+
+# ── reading / applying ─────────────────────────────────────────────────
+
+def read_header(delta: bytes) -> Dict:
+    if delta[:len(MAGIC)] not in (MAGIC, MAGIC_V1):
+        raise DeltaError("not a .dvdelta file")
+    fields = HEADER.unpack_from(delta, len(MAGIC))
+    return {
+        "source_size": fields[0], "source_sha256": fields[1].hex(),
+        "target_size": fields[2], "target_sha256": fields[3].hex(),
+        "records": fields[4], "payload_size": fields[5], "delta_size": len(delta),
+    }
+
+
+def iter_records(delta: bytes) -> Iterator[Record]:
+    """Yield (source offset, old, new) in source order"""
+    info = read_header(delta)
+    start = len(MAGIC) + HEADER.size
+    payload = zlib.decompress(delta[start:start + info["payload_size"]])
+    legacy = delta[:len(MAGIC)] == MAGIC_V1
+    pos = 0
+    for _ in range(info["records"]):
+        if legacy:
+            # Same-offset records; a size change is a final zero-padded record
+            offset, length = RECORD_V1.unpack_from(payload, pos)
+            pos += RECORD_V1.size
+            old = payload[pos:pos + length][:max(0, info["source_size"] - offset)]
+            new = payload[pos + length:pos + 2 * length][:max(0, info["target_size"] - offset)]
+            pos += 2 * length
+        else:
+            offset, old_len, new_len = RECORD.unpack_from(payload, pos)
+            pos += RECORD.size
+            old = payload[pos:pos + old_len]
+            new = payload[pos + old_len:pos + old_len + new_len]
+            pos += old_len + new_len
+        yield offset, old, new
+
+
+def invert_records(records: List[Record]) -> List[Record]:
+    """Records that turn the target back into the source"""
+    inverted, shift = [], 0
+    for offset, old, new in records:
+        inverted.append((offset + shift, new, old))
+        shift += len(new) - len(old)
+    return inverted
+
+
+def _holds(f: BinaryIO, records: List[Record], side: int) -> bool:
+    """True if every record's old (side 1) / new (side 2) bytes are in place,
+    with new bytes looked up at their offsets in the result"""
+    located = records if side == 1 else invert_records(records)
+    for offset, data, _ in located:
+        f.seek(offset)
+        if f.read(len(data)) != data:
+            return False
+    return True
+
+
+def apply_delta(delta: bytes, path: str, full_verify: bool = False, reverse: bool = False) -> int:
+    """Apply (or revert) a delta; returns the number of bytes written.
+
+    Length-changing deltas always check the result hash. In-place deltas
+    only check the record ranges unless full_verify is set.
+    """
+    info = read_header(delta)
+    base_size, final_size, final_hash = (
+        (info["target_size"], info["source_size"], info["source_sha256"]) if reverse else
+        (info["source_size"], info["target_size"], info["target_sha256"])
+    )
+    records = list(iter_records(delta))
+    if reverse:
+        records = invert_records(records)
+
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        if size not in (base_size, final_size):
+            raise DeltaError(f"size {size} matches neither base ({base_size}) nor result ({final_size})")
+        if all(len(old) == len(new) for _, old, new in records):
+            if full_verify and _result_sha256(f, records, final_size) != final_hash:
+                raise DeltaError("base file differs outside the patched ranges")
+            written = _apply_in_place(f, records)
+            f.truncate(final_size)
+        elif size == base_size and _holds(f, records, 1):
+            written = None
+        elif size == final_size and _holds(f, records, 2):
+            return 0        # already applied
+        else:
+            raise DeltaError("file matches neither side of the delta")
+
+    if written is None:
+        written = _rewrite(path, records, base_size, final_hash)
+    return written
+
+
+def _result_sha256(f: BinaryIO, records: List[Record], final_size: int) -> str:
+    """sha256 of the file with every (same-length) record range holding its
+    new bytes, without writing; also right for a half-applied file"""
+    digest = hashlib.sha256()
+
+    def hash_range(start: int, end: int) -> None:
+        f.seek(start)
+        while start < end:
+            block = f.read(min(COPY_BLOCK, end - start))
+            if not block:
+                break
+            digest.update(block)
+            start += len(block)
+
+    pos = 0
+    for offset, _old, new in records:
+        hash_range(pos, offset)
+        digest.update(new)
+        pos = offset + len(new)
+    hash_range(pos, final_size)
+    return digest.hexdigest()
+
+
+def _apply_in_place(f: BinaryIO, records: List[Record]) -> int:
+    # Check every range first so a wrong base is never half-patched
+    for offset, old, new in records:
+        f.seek(offset)
+        current = f.read(len(old))
+        if current != old and current != new:
+            raise DeltaError(f"unexpected content at offset {offset}")
+
+    written = 0
+    for offset, old, new in records:
+        f.seek(offset)
+        if f.read(len(new)) == new:
+            continue
+        f.seek(offset)
+        f.write(new)
+        written += len(new)
+    return written
+
+
+def _rewrite(path: str, records: List[Record], base_size: int, final_hash: str) -> int:
+    """Stream source ranges and new bytes into a temp file, hashing them on
+    the way, and replace the original only if the hash matches"""
+    tmp = f"{path}.dvdelta_tmp"
+    digest = hashlib.sha256()
+    with open(path, "rb") as src, open(tmp, "wb") as out:
+        def emit(data: bytes) -> None:
+            digest.update(data)
+            out.write(data)
+
+        def copy(start: int, end: int) -> None:
+            src.seek(start)
+            while start < end:
+                block = src.read(min(COPY_BLOCK, end - start))
+                if not block:
+                    break
+                emit(block)
+                start += len(block)
+
+        pos = 0
+        for offset, old, new in records:
+            copy(pos, offset)
+            emit(new)
+            pos = offset + len(old)
+        copy(pos, base_size)
+        written = out.tell()
+    if digest.hexdigest() != final_hash:
+        os.remove(tmp)
+        raise DeltaError("result hash mismatch (base file differs outside the patched ranges)")
+    shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+    return written
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    commands = {"make": 3, "apply": 2, "revert": 2, "info": 1}
+    if not args or args[0] not in commands or len(args) - 1 < commands[args[0]]:
+        print("Usage: python asset_delta.py make <original> <patched> <out.dvdelta>")
+        print("       python asset_delta.py apply|revert <patch.dvdelta> <file> [--quick]")
+        print("       python asset_delta.py info <patch.dvdelta>")
+        sys.exit(1)
+
+    command = args[0]
+    try:
+        if command == "make":
+            info = make_delta_files(args[1], args[2], args[3])
+            print(f"✅ {args[3]}: {info['records']} record(s), {info['delta_size']} bytes "
+                  f"(asset {info['target_size'] / 1048576:.1f} MiB)")
+            return
+        with open(args[1], "rb") as f:
+            delta = f.read()
+        if command == "info":
+            for key, value in read_header(delta).items():
+                print(f"  {key}: {value}")
+            return
+        written = apply_delta(delta, args[2], "--quick" not in args, reverse=command == "revert")
+        print(f"✅ {'Reverted' if command == 'revert' else 'Applied'} {args[1]} → {args[2]} "
+              f"({written} bytes written)")
+    except (DeltaError, OSError, zlib.error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
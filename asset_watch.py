@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+DEVOUR Asset Watcher
+Long-running watch mode for the Vietnamese patchers: after a game update,
+only the created/modified files are re-patched, once their writes settle.
+
+  * .json/.txt under StreamingAssets and Resources -> patch_devour_assets
+  * .assets under DEVOUR_Data                      -> patch-devour-language-v2
+
+Originals are backed up to .vi_backups next to the watched DEVOUR_Data.
+
+Change detection uses watchdog (inotify / ReadDirectoryChangesW) when it
+is installed and falls back to polling with a single os.scandir walk.
+
+Usage:
+    python asset_watch.py [--root <DEVOUR_Data>] [--interval 2] [--debounce 3]
+                          [--initial] [--poll]
+"""
+
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from patch_devour_assets import (DEVOUR_DATA, TEXT_EXTENSIONS, TEXT_FOLDERS, TEXT_MAX_SIZE,
+                                 scan_tree)
+
+ASSET_EXTENSIONS = (".assets",)
+WATCH_EXTENSIONS = TEXT_EXTENSIONS + ASSET_EXTENSIONS
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _text_dirs(root: Path) -> Tuple[str, ...]:
+    """normcase'd prefixes of the folders whose .json/.txt files are patched"""
+    return tuple(os.path.normcase(os.path.join(root, name)) + os.sep for name in TEXT_FOLDERS)
+
+
+def _wanted(path: str, size: int, text_dirs: Tuple[str, ...]) -> bool:
+    lower = path.lower()
+    if lower.endswith(ASSET_EXTENSIONS):
+        return True
+    return (lower.endswith(TEXT_EXTENSIONS) and size <= TEXT_MAX_SIZE
+            and os.path.normcase(path).startswith(text_dirs))
+
+
+class PollingWatcher:
+    """Snapshot diff over scan_tree(); reports created and modified files"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.text_dirs = _text_dirs(root)
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = scan_tree(self.root, WATCH_EXTENSIONS)
+        return {p: sig for p, sig in found.items() if _wanted(p, sig[1], self.text_dirs)}
+
+    def changes(self, timeout: float) -> List[str]:
+        time.sleep(timeout)
+        current = self._scan()
+        changed = [p for p, sig in current.items() if self.snapshot.get(p) != sig]
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class WatchdogWatcher:
+    """Event-driven watcher; raises ImportError if watchdog is missing"""
+
+    def __init__(self, root: Path):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        events: "queue.Queue[str]" = queue.Queue()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type not in ("created", "modified", "moved"):
+                    return
+                path = getattr(event, "dest_path", "") or event.src_path
+                if path.lower().endswith(WATCH_EXTENSIONS):
+                    events.put(path)
+
+        self.events = events
+        self.observer = Observer()
+        self.observer.schedule(Handler(), str(root), recursive=True)
+        self.observer.start()
+
+    def changes(self, timeout: float) -> List[str]:
+        changed = []
+        try:
+            changed.append(self.events.get(timeout=timeout))
+            while True:
+                changed.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return changed
+
+    def close(self) -> None:
+        self.observer.stop()
+        self.observer.join()
+
+
+class Debouncer:
+    """Holds paths until their (mtime, size) stopped changing for `quiet` seconds"""
+
+    def __init__(self, quiet: float, clock: Callable[[], float] = time.monotonic):
+        self.quiet = quiet
+        self.clock = clock
+        self.pending: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+
+    def add(self, paths: Iterable[str]) -> None:
+        now = self.clock()
+        for path in paths:
+            self.pending[path] = (now, _stat(path))
+
+    def ready(self) -> List[str]:
+        now = self.clock()
+        settled = []
+        for path, (seen, sig) in list(self.pending.items()):
+            if now - seen < self.quiet:
+                continue
+            current = _stat(path)
+            if current is None:
+                del self.pending[path]           # deleted again mid-update
+            elif current != sig:
+                self.pending[path] = (now, current)  # still being written
+            else:
+                del self.pending[path]
+                settled.append(path)
+        return settled
+
+
+class AssetPatcher:
+    """Routes a file to the right patcher and remembers what it wrote, so
+    the watcher does not react to its own output"""
+
+    def __init__(self, root: Path):
+        self.text_dirs = _text_dirs(root)
+        self.backup_dir = Path(root).resolve().parent / ".vi_backups"
+        self.written: Dict[str, Tuple[int, int]] = {}
+        self._v2 = None
+
+    def _v2_module(self):
+        if self._v2 is None:
+            from steamtools import load_script
+            self._v2 = load_script("patch-devour-language-v2.py")
+        return self._v2
+
+    def patch(self, path: str) -> bool:
+        sig = _stat(path)
+        if sig is None or self.written.get(path) == sig or \
+                not _wanted(path, sig[1], self.text_dirs):
+            return False
+        if path.lower().endswith(ASSET_EXTENSIONS):
+            v2 = self._v2_module()
+            changed = v2.patch_asset_file(path, v2.VI_TRANSLATIONS,
+                                          backup_dir=self.backup_dir) > 0
+        else:
+            from patch_devour_assets import patch_json_file
+            changed = patch_json_file(Path(path), self.backup_dir)
+        self.written[path] = _stat(path)
+        return changed
+
+
+def watch(root: Path, interval: float = 2.0, debounce: float = 3.0,
+          initial: bool = False, use_watchdog: bool = True) -> None:
+    watcher = None
+    if use_watchdog:
+        try:
+            watcher = WatchdogWatcher(root)
+            print("👀 Watching with filesystem events (watchdog)")
+        except ImportError:
+            print("ℹ️  watchdog not installed (pip install watchdog), falling back to polling")
+    if watcher is None:
+        watcher = PollingWatcher(root)
+        print(f"👀 Polling every {interval:g}s ({len(watcher.snapshot)} files tracked)")
+
+    patcher = AssetPatcher(root)
+    debouncer = Debouncer(debounce)
+    if initial:
+        debouncer.add(scan_tree(root, WATCH_EXTENSIONS))
+
+    try:
+        while True:
+            debouncer.add(watcher.changes(interval if not debouncer.pending else min(interval, debounce)))
+            ready = debouncer.ready()
+            if not ready:
+                continue
+            started = time.perf_counter()
+            patched = sum(patcher.patch(path) for path in ready)
+            print(f"🔄 {len(ready)} changed file(s), {patched} patched "
+                  f"in {time.perf_counter() - started:.1f}s")
+    except KeyboardInterrupt:
+        print("\n⏹  Stopped watching")
+    finally:
+        watcher.close()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    root = Path(option("--root", DEVOUR_DATA))
+    print("\n" + "=" * 60)
+    print("🇻🇳 DEVOUR Vietnamese Asset Watcher")
+    print("=" * 60 + "\n")
+    if not root.exists():
+        print(f"❌ Game data folder not found: {root}")
+        sys.exit(1)
+
+    watch(root, float(option("--interval", 2)), float(option("--debounce", 3)),
+          initial="--initial" in args, use_watchdog="--poll" not in args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Asset Backup Store
+Keeps the original (unpatched) content of game files as deduplicated
+chunks, shared across files and game versions.
+
+    <store>/objects/ab/<blake2b-256>   chunk (zlib, or raw in reflink mode)
+    <store>/catalog.json               path -> versions -> [digest, size] list
+
+Chunk boundaries are content-defined (~320 KiB average, 64 KiB - 2 MiB):
+a chunk ends where the last 18 bytes match a fixed pattern, so inserting
+or removing bytes only changes the chunks around the edit and a new game
+version re-uses every chunk outside the changed regions.
+
+  * unchanged files (same size + mtime) are skipped without being read
+  * only chunks the store has not seen are written
+  * on reflink-capable filesystems (btrfs, XFS) chunks are stored raw and
+    block-aligned ones are cloned in/out with FICLONERANGE instead of copied
+  * restore rewrites only the chunks that differ, files in parallel
+
+The patchers call backup() before writing and mark_patched() after, so a
+file they produced is never mistaken for a new original. Code in one
+process shares the instance from get_store(); catalog.json is re-read and
+merged under a file lock on every save, so separate processes do not
+overwrite each other's entries.
+
+Usage:
+    python backup_store.py backup <file>... [--store DIR]
+    python backup_store.py restore [<file>...] [--store DIR] [--workers N]
+    python backup_store.py stats|gc [--store DIR]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from file_lock import FileLock
+
+CATALOG_VERSION = 2
+LEGACY_CHUNK_SIZE = 1024 * 1024     # version 1 catalogs: fixed chunks, digests only
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 2 * 1024 * 1024
+READ_SIZE = 8 * MAX_CHUNK
+
+# Every byte value is put in class 0 or 1 by a fixed pseudo-random split; a
+# chunk ends after 18 bytes whose classes spell BOUNDARY (p = 2**-18 per
+# byte of varied data). Runs of one byte never match. Both tables define
+# chunk identity and must never change.
+_SEED = hashlib.blake2b(b"backup_store content-defined chunking", digest_size=64).digest()
+CLASSES = bytes((_SEED[i // 8] >> (i % 8)) & 1 for i in range(256))
+BOUNDARY = bytes((_SEED[32 + i // 8] >> (i % 8)) & 1 for i in range(18))
+GC_GRACE = 3600  # never collect chunks younger than this; a backup may be mid-write
+FICLONERANGE = 0x4020940D  # linux/fs.h
+
+
+def _digest(data) -> str:
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def iter_chunks(f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, data) content-defined chunks of a binary file.
+    Boundaries are found with bytes.translate + find, both in C."""
+    buf, classes = bytearray(), bytearray()
+    pos, offset, eof = 0, 0, False
+    while True:
+        if not eof and len(buf) - pos < MAX_CHUNK:
+            del buf[:pos], classes[:pos]
+            pos = 0
+            data = f.read(READ_SIZE)
+            if data:
+                buf += data
+                classes += data.translate(CLASSES)
+            else:
+                eof = True
+            continue
+        if pos >= len(buf):
+            return
+        hit = classes.find(BOUNDARY, pos + MIN_CHUNK - len(BOUNDARY), pos + MAX_CHUNK)
+        end = hit + len(BOUNDARY) if hit >= 0 else min(pos + MAX_CHUNK, len(buf))
+        yield offset, bytes(buf[pos:end])
+        offset += end - pos
+        pos = end
+
+
+def chunk_spans(version: Dict) -> Iterator[Tuple[int, str, int]]:
+    """(offset, digest, size) of every chunk of a catalog version"""
+    offset = 0
+    for chunk in version["chunks"]:
+        if isinstance(chunk, str):
+            digest, size = chunk, min(LEGACY_CHUNK_SIZE, version["size"] - offset)
+        else:
+            digest, size = chunk
+        yield offset, digest, size
+        offset += size
+
+
+def _clone_range(src_fd: int, src_offset: int, length: int, dst_fd: int, dst_offset: int) -> bool:
+    """Share extents between files (reflink). False if unsupported here."""
+    if sys.platform != "linux":
+        return False
+    try:
+        import fcntl
+        import struct
+        fcntl.ioctl(dst_fd, FICLONERANGE,
+                    struct.pack("qQQQ", src_fd, src_offset, length, dst_offset))
+        return True
+    except (OSError, ImportError):
+        return False
+
+
+class BackupStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.catalog_file = self.root / "catalog.json"
+        self.lock = threading.Lock()
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.file_lock = FileLock(self.root / ".lock")
+        self.dirty = set()      # file keys changed here and not yet saved
+        self.catalog = self._read_catalog()
+        if self.catalog["reflink"] is None:
+            with self.file_lock:
+                self.catalog = self._read_catalog()
+                if self.catalog["reflink"] is None:
+                    self.catalog["reflink"] = self._probe_reflink()
+                    self._sync(write=True)
+
+    # ── internals ──────────────────────────────────────────────────────
+
+    def _probe_reflink(self) -> bool:
+        src, dst = self.root / ".probe_src", self.root / ".probe_dst"
+        try:
+            src.write_bytes(b"\0" * 4096)
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                return _clone_range(s.fileno(), 0, 4096, d.fileno(), 0)
+        finally:
+            for p in (src, dst):
+                if p.exists():
+                    p.unlink()
+
+    def _read_catalog(self) -> Dict:
+        if not self.catalog_file.exists():
+            return {"version": CATALOG_VERSION, "reflink": None, "files": {}}
+        with open(self.catalog_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _sync(self, write: bool) -> None:
+        """Re-read catalog.json and merge in the records changed here (call
+        with self.lock and self.file_lock held). Versions another process
+        added to the same file are kept."""
+        disk = self._read_catalog()
+        disk["version"] = CATALOG_VERSION     # version 1 entries are still read
+        if disk["reflink"] is None:
+            disk["reflink"] = self.catalog["reflink"]
+        for key in self.dirty:
+            ours = self.catalog["files"][key]
+            theirs = disk["files"].get(key)
+            if theirs:
+                known = {v["digest"] for v in ours["versions"]}
+                extra = [v for v in theirs["versions"] if v["digest"] not in known]
+                if extra:
+                    ours["versions"] = sorted(extra + ours["versions"], key=lambda v: v["time"])
+            disk["files"][key] = ours
+        self.catalog = disk
+        self.dirty.clear()
+        if write:
+            tmp = self.catalog_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.catalog, f, separators=(",", ":"))
+            os.replace(tmp, self.catalog_file)
+
+    def _save(self) -> None:
+        with self.file_lock:
+            self._sync(write=True)
+
+    def refresh(self) -> None:
+        """Pick up entries other processes saved since we last looked"""
+        with self.lock, self.file_lock:
+            self._sync(write=bool(self.dirty))
+
+    def _record(self, key: str) -> Dict:
+        """Catalog record for a file key, marked as changed (self.lock held)"""
+        self.dirty.add(key)
+        return self.catalog["files"].setdefault(key, {"versions": [], "patched": None})
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _put_chunk(self, digest: str, data: bytes, src_fd: int, offset: int) -> int:
+        """Store a chunk if new; returns bytes written to the store"""
+        path = self._object_path(digest)
+        if path.exists():
+            os.utime(path)      # restart its gc grace period
+            return 0
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as out:
+            if not (self.catalog["reflink"]
+                    and _clone_range(src_fd, offset, len(data), out.fileno(), 0)):
+                payload = data if self.catalog["reflink"] else zlib.compress(data, 1)
+                out.write(payload)
+        os.replace(tmp, path)
+        return path.stat().st_size
+
+    def _get_chunk(self, digest: str) -> bytes:
+        data = self._object_path(digest).read_bytes()
+        return data if self.catalog["reflink"] else zlib.decompress(data)
+
+    @staticmethod
+    def _key(path) -> str:
+        return str(Path(path).resolve())
+
+    @staticmethod
+    def _signature(path) -> List[int]:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+
+    # ── public API ─────────────────────────────────────────────────────
+
+    def backup(self, path, label: str = "") -> Optional[Dict]:
+        """Record the current content of `path` as its original.
+
+        Returns the version entry, or None when nothing had to be stored
+        (unchanged since the last backup, or it is our own patched output).
+        """
+        key = self._key(path)
+        sig = self._signature(path)
+        self.refresh()
+        with self.lock:
+            record = self.catalog["files"].get(key, {"versions": [], "patched": None})
+            latest = record["versions"][-1] if record["versions"] else None
+            if record["patched"] == sig or (latest and latest["signature"] == sig):
+                return None
+
+        chunks, whole, stored = [], hashlib.blake2b(digest_size=32), 0
+        with open(path, "rb") as f:
+            for offset, data in iter_chunks(f):
+                digest = _digest(data)
+                whole.update(data)
+                stored += self._put_chunk(digest, data, f.fileno(), offset)
+                chunks.append([digest, len(data)])
+
+        version = {
+            "signature": sig,
+            "size": sig[1],
+            "digest": whole.hexdigest(),
+            "chunks": chunks,
+            "label": label,
+            "time": int(time.time()),
+        }
+        with self.lock:
+            record = self._record(key)
+            latest = record["versions"][-1] if record["versions"] else None
+            if latest and latest["digest"] == version["digest"]:
+                latest["signature"] = sig     # touched, not changed
+            else:
+                record["versions"].append(version)
+            self._save()
+        print(f"💾 Backed up {Path(path).name}: {len(chunks)} chunk(s), "
+              f"{stored / 1024:.1f} KiB new")
+        return version
+
+    def mark_patched(self, path) -> None:
+        """Remember the signature of a file we just wrote"""
+        key = self._key(path)
+        with self.lock:
+            self._record(key)["patched"] = self._signature(path)
+            self._save()
+
+    def restore(self, path, version: int = -1) -> int:
+        """Bring `path` back to a stored version; returns bytes rewritten"""
+        key = self._key(path)
+        record = self.catalog["files"].get(key)
+        if not record or not record["versions"]:
+            self.refresh()
+            record = self.catalog["files"].get(key)
+        if not record or not record["versions"]:
+            raise KeyError(f"no backup for {path}")
+        target = record["versions"][version]
+
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        written = 0
+        with open(path, mode) as f:
+            for offset, digest, size in chunk_spans(target):
+                f.seek(offset)
+                current = f.read(size)
+                if current and _digest(current) == digest:
+                    continue
+                f.seek(offset)
+                f.flush()
+                cloned = False
+                if self.catalog["reflink"]:
+                    obj = self._object_path(digest)
+                    with open(obj, "rb") as src:
+                        cloned = _clone_range(src.fileno(), 0, obj.stat().st_size, f.fileno(), offset)
+                if not cloned:
+                    data = self._get_chunk(digest)
+                    f.write(data)
+                    written += len(data)
+            f.truncate(target["size"])
+
+        with self.lock:
+            record = self._record(key)
+            record["patched"] = None
+            for stored in record["versions"]:
+                if stored["digest"] == target["digest"]:
+                    stored["signature"] = self._signature(path)
+            self._save()
+        return written
+
+    def restore_all(self, paths: Optional[Iterable[str]] = None, workers: int = 4) -> Dict[str, int]:
+        self.refresh()
+        keys = [self._key(p) for p in paths] if paths else list(self.catalog["files"])
+        keys = [k for k in keys if self.catalog["files"].get(k, {}).get("versions")]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return dict(zip(keys, pool.map(self.restore, keys)))
+
+    def gc(self) -> int:
+        """Delete chunks no version references; returns how many.
+        Runs under the file lock against the merged on-disk catalog."""
+        removed = 0
+        with self.lock, self.file_lock:
+            self._sync(write=bool(self.dirty))
+            live = {digest for rec in self.catalog["files"].values()
+                    for v in rec["versions"] for _, digest, _ in chunk_spans(v)}
+            cutoff = time.time() - GC_GRACE
+            for shard in self.objects.iterdir():
+                for obj in shard.iterdir():
+                    if obj.name not in live and obj.stat().st_mtime < cutoff:
+                        obj.unlink()
+                        removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        logical = sum(v["size"] for rec in self.catalog["files"].values() for v in rec["versions"])
+        physical, objects = 0, 0
+        for shard in self.objects.iterdir():
+            for obj in shard.iterdir():
+                physical += obj.stat().st_size
+                objects += 1
+        return {"files": len(self.catalog["files"]), "objects": objects,
+                "logical_bytes": logical, "stored_bytes": physical,
+                "reflink": self.catalog["reflink"]}
+
+
+_shared: Dict[Path, BackupStore] = {}
+_shared_lock = threading.Lock()
+
+
+def get_store(root: Path) -> BackupStore:
+    """Process-wide store per directory, so every patcher in one process
+    (e.g. asset_watch.py) works on the same catalog and lock"""
+    key = Path(root).resolve()
+    with _shared_lock:
+        store = _shared.get(key)
+        if store is None:
+            store = _shared[key] = BackupStore(root)
+        return store
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        if flag in args:
+            i = args.index(flag)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        return default
+
+    store_dir = option("--store", ".asset_backups")
+    workers = int(option("--workers", os.cpu_count() or 4))
+    if not args or args[0] not in ("backup", "restore", "stats", "gc"):
+        print("Usage: python backup_store.py backup|restore|stats|gc [files...] "
+              "[--store DIR] [--workers N]")
+        sys.exit(1)
+
+    store = get_store(Path(store_dir))
+    command, files = args[0], args[1:]
+    if command == "backup":
+        for path in files:
+            store.backup(path)
+    elif command == "restore":
+        started = time.perf_counter()
+        results = store.restore_all(files or None, workers)
+        for path, written in results.items():
+            print(f"♻️  Restored {Path(path).name} ({written / 1024:.1f} KiB rewritten)")
+        print(f"✅ {len(results)} file(s) restored in {time.perf_counter() - started:.2f}s")
+    elif command == "stats":
+        stats = store.stats()
+        print(f"📊 {stats['files']} files, {stats['objects']} chunks, "
+              f"{stats['logical_bytes'] / 1048576:.1f} MiB of originals in "
+              f"{stats['stored_bytes'] / 1048576:.1f} MiB (reflink: {stats['reflink']})")
+    elif command == "gc":
+        print(f"🧹 Removed {store.gc()} unreferenced chunk(s)")
+
+
+if __name__ == "__main__":
+    main()
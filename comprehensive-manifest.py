@@ -10,7 +10,6 @@ import subprocess
 import hashlib
 import re
 import json
-import requests
 from pathlib import Path
 from typing import Dict, List, Tuple
 import sys
@@ -23,6 +22,7 @@ class SteamManifestGenerator:
         self.dlcs = {}
         self.tokens = {}
         self.hashes = {}
+        self.change_number = 0
         
     def method1_steamcmd(self) -> Dict:
         """METHOD 1: Fetch from SteamCMD"""
@@ -38,6 +38,10 @@ class SteamManifestGenerator:
             )
             output = result.stdout + result.stderr
             
+            change = re.search(r'"change_number"\s+"(\d+)"', output)
+            if change:
+                self.change_number = int(change.group(1))
+            
             # Parse depots
             depot_pattern = r'"(\d+)"\s*\n\s*{\s*"manifests"[\s\S]*?"gid"\s+"(\d+)"'
             for match in re.finditer(depot_pattern, output):
@@ -56,6 +60,7 @@ class SteamManifestGenerator:
         print("[METHOD 2] Fetching from SteamDB API...")
         
         try:
+            import requests  # deferred: not needed for override/cache-only runs
             url = f"https://steamdb.info/api/GetAppInfo/?appid={self.app_id}&json=1"
             headers = {"User-Agent": "Mozilla/5.0"}
             
@@ -84,6 +89,7 @@ class SteamManifestGenerator:
         print("[METHOD 3] Fetching from Steam Web API...")
         
         try:
+            import requests
             # Try public app data endpoint
             url = f"https://api.steampowered.com/ISteamApps/GetAppList/v2/"
             response = requests.get(url, timeout=10)
@@ -207,6 +213,11 @@ class SteamManifestGenerator:
         
         return {"status": "success", "hashes_calculated": len(self.hashes)}
     
+    def to_model(self):
+        """Compact array-backed copy of depots/DLCs/tokens/hashes"""
+        from manifest_model import AppManifest
+        return AppManifest.from_generator(self)
+    
     def generate_lua(self) -> str:
         """STEP 5: Generate Lua manifest"""
         print("\n[STEP 5] Generating Lua manifest...")
@@ -240,14 +251,12 @@ addappid({self.app_id})
 """
         
         # Add base game depots
+        model = self.to_model()
         if self.depots:
             lua += "-- BASE GAME DEPOTS\n"
             lua += "-- ───────────────────────────────────────────────────────────────────\n"
-            for depot_id, manifest_id in sorted(self.depots.items()):
-                if manifest_id and depot_id in self.hashes:
-                    lua += f"addappid({depot_id}, 1, \"{self.hashes[depot_id]}\")\n"
-                else:
-                    lua += f"addappid({depot_id})\n"
+            for line in model.depot_lines():
+                lua += line + "\n"
             lua += "\n"
         
         # Add DLC apps and tokens
@@ -255,10 +264,8 @@ addappid({self.app_id})
             lua += "-- DLC & BONUS CONTENT\n"
             lua += "-- ───────────────────────────────────────────────────────────────────\n"
             
-            for dlc_id in sorted(self.dlcs.keys()):
-                lua += f"addappid({dlc_id})\n"
-                if dlc_id in self.tokens:
-                    lua += f"addtoken({dlc_id}, \"{self.tokens[dlc_id]}\")\n"
+            for line in model.dlc_lines():
+                lua += line + "\n"
             lua += "\n"
         
         lua += """-- ═══════════════════════════════════════════════════════════════════
@@ -281,8 +288,21 @@ addappid({self.app_id})
             f.write(lua_content)
         
         print(f"  ✓ Saved to: {out_file}")
+        self.record_history()
         return True
     
+    def record_history(self) -> int:
+        """Append depot gid changes to the history store (history/)"""
+        try:
+            from manifest_history import get_store
+            added = get_store().record(self.app_id, self.depots, self.change_number)
+            if added:
+                print(f"  ✓ History: {added} depot change(s) recorded")
+            return added
+        except Exception as e:
+            print(f"  ⚠ History not updated: {e}")
+            return 0
+    
     def run_all_methods(self):
         """Run all 7 methods to fetch complete manifest"""
         print(f"\n{'='*60}")
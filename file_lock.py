@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Cross-process advisory file lock
+flock() on POSIX, msvcrt.locking() on Windows. The lock is per open file,
+so it also serializes threads that each enter their own FileLock.
+
+    with FileLock(store_dir / ".lock"):
+        ...read, merge, write...
+"""
+
+import os
+import time
+from pathlib import Path
+
+
+class FileLock:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = None
+
+    def __enter__(self) -> "FileLock":
+        self.file = open(self.path, "a+b")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self.file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:     # LK_LOCK gives up after ~10s
+                        time.sleep(0.1)
+            else:
+                import fcntl
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self.file.close()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.file.close()
+            self.file = None
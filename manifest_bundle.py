@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Manifest Bundle Archive
+Packs every rendered manifest into one file with a sorted AppID index at
+the front, so consumers can download a single file and still pull out
+one manifest without decompressing the rest.
+
+Layout (little-endian):
+    header   b"SMBNDL01", entry count u32, block count u32
+    index    entry count x (appid u32, block u32, offset u32, length u32)
+    blocks   block count x (file offset u64, stored size u32, raw size u32,
+             digest[16])
+    data     zlib-compressed blocks
+
+Entries are grouped into blocks at content-defined boundaries (a hash of
+the AppID), so adding or changing one app only changes its own block;
+repacking copies every unchanged block from the previous bundle as-is.
+
+Usage:
+    python manifest_bundle.py pack [--out manifests.bundle]
+    python manifest_bundle.py get <AppID> [--bundle manifests.bundle]
+    python manifest_bundle.py list|info [--bundle manifests.bundle]
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"SMBNDL01"
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<IIII")
+BLOCK = struct.Struct("<QII16s")
+DEFAULT_BUNDLE = "manifests.bundle"
+
+BOUNDARY_MASK = 0xF           # ~16 apps per block on average
+MAX_BLOCK_RAW = 256 * 1024    # hard cap regardless of boundaries
+
+
+def _is_boundary(app_id: int) -> bool:
+    return ((app_id * 2654435761) >> 8) & BOUNDARY_MASK == 0
+
+
+def _split_blocks(entries: List[Tuple[int, bytes]]) -> List[List[Tuple[int, bytes]]]:
+    blocks, current, size = [], [], 0
+    for app_id, data in entries:
+        current.append((app_id, data))
+        size += len(data)
+        if _is_boundary(app_id) or size >= MAX_BLOCK_RAW:
+            blocks.append(current)
+            current, size = [], 0
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _block_digest(block: List[Tuple[int, bytes]]) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for app_id, data in block:
+        digest.update(struct.pack("<II", app_id, len(data)))
+        digest.update(data)
+    return digest.digest()
+
+
+class BundleReader:
+    """mmap-backed reader; get() is a binary search plus one block inflate"""
+
+    def __init__(self, path: str = DEFAULT_BUNDLE):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.block_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a manifest bundle")
+        self.index_offset = HEADER.size
+        self.blocks_offset = self.index_offset + self.count * ENTRY.size
+        # Flat uint32 view over the index: [appid, block, offset, length] * count
+        self.index = memoryview(self.map)[self.index_offset:self.blocks_offset].cast("I")
+        self._cached: Tuple[int, Optional[bytes]] = (-1, None)
+
+    def close(self) -> None:
+        self.index.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def app_ids(self) -> List[int]:
+        return list(self.index[0::4])
+
+    def block_info(self, block: int) -> Tuple[int, int, int, bytes]:
+        return BLOCK.unpack_from(self.map, self.blocks_offset + block * BLOCK.size)
+
+    def raw_block(self, block: int) -> bytes:
+        offset, stored, _raw, _digest = self.block_info(block)
+        return self.map[offset:offset + stored]
+
+    def _find(self, app_id: int) -> int:
+        lo, hi = 0, self.count
+        index = self.index
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index[mid * 4] < app_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.count and index[lo * 4] == app_id else -1
+
+    def get(self, app_id: int) -> Optional[str]:
+        pos = self._find(app_id)
+        if pos < 0:
+            return None
+        _, block, offset, length = self.index[pos * 4:pos * 4 + 4]
+        if self._cached[0] != block:
+            self._cached = (block, zlib.decompress(self.raw_block(block)))
+        return self._cached[1][offset:offset + length].decode("utf-8")
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        for app_id in self.app_ids():
+            yield app_id, self.get(app_id)
+
+
+def collect_manifests() -> List[Tuple[int, bytes]]:
+    """Newest manifest file per AppID from manifests/ and lua_game/"""
+    from manifest_index import ManifestIndex
+
+    index = ManifestIndex().load()
+    newest: Dict[int, Tuple[int, str]] = {}
+    for path, entry in index.files.items():
+        app_id = entry["appid"]
+        if app_id is not None and entry["mtime_ns"] > newest.get(app_id, (-1, ""))[0]:
+            newest[app_id] = (entry["mtime_ns"], path)
+    entries = []
+    for app_id in sorted(newest):
+        with open(newest[app_id][1], "rb") as f:
+            entries.append((app_id, f.read()))
+    return entries
+
+
+def pack(entries: List[Tuple[int, bytes]], out_path: str = DEFAULT_BUNDLE) -> Dict[str, int]:
+    """Write a bundle; blocks identical to the existing bundle's are reused"""
+    entries = sorted(entries)
+    blocks = _split_blocks(entries)
+
+    previous: Dict[bytes, bytes] = {}
+    if os.path.exists(out_path):
+        try:
+            with BundleReader(out_path) as old:
+                for b in range(old.block_count):
+                    previous[old.block_info(b)[3]] = old.raw_block(b)
+        except (ValueError, struct.error):
+            previous = {}
+
+    index, table, payloads = [], [], []
+    reused = 0
+    for block_no, block in enumerate(blocks):
+        raw = bytearray()
+        for app_id, data in block:
+            index.append((app_id, block_no, len(raw), len(data)))
+            raw += data
+        digest = _block_digest(block)
+        stored = previous.get(digest)
+        if stored is None:
+            stored = zlib.compress(bytes(raw), 9)
+        else:
+            reused += 1
+        table.append((len(stored), len(raw), digest))
+        payloads.append(stored)
+
+    data_offset = HEADER.size + len(index) * ENTRY.size + len(blocks) * BLOCK.size
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(index), len(blocks)))
+        for entry in index:
+            f.write(ENTRY.pack(*entry))
+        offset = data_offset
+        for stored_size, raw_size, digest in table:
+            f.write(BLOCK.pack(offset, stored_size, raw_size, digest))
+            offset += stored_size
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp, out_path)
+    return {"entries": len(index), "blocks": len(blocks), "reused": reused,
+            "size": os.path.getsize(out_path)}
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    if not args or args[0] not in ("pack", "get", "list", "info"):
+        print("Usage: python manifest_bundle.py pack [--out FILE] | get <AppID> | list | info "
+              "[--bundle FILE]")
+        sys.exit(1)
+
+    command = args[0]
+    if command == "pack":
+        out = option("--out", DEFAULT_BUNDLE)
+        stats = pack(collect_manifests(), out)
+        print(f"📦 {out}: {stats['entries']} manifests in {stats['blocks']} blocks "
+              f"({stats['reused']} reused), {stats['size'] / 1024:.1f} KiB")
+        return
+
+    with BundleReader(option("--bundle", DEFAULT_BUNDLE)) as bundle:
+        if command == "get":
+            lua = bundle.get(int(args[1]))
+            if lua is None:
+                print(f"❌ AppID {args[1]} not in bundle")
+                sys.exit(1)
+            sys.stdout.write(lua)
+        elif command == "list":
+            for app_id in bundle.app_ids():
+                print(app_id)
+        elif command == "info":
+            raw = sum(bundle.block_info(b)[2] for b in range(bundle.block_count))
+            print(f"📦 {len(bundle)} manifests, {bundle.block_count} blocks, "
+                  f"{raw / 1024:.1f} KiB uncompressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Depot Manifest History
+Append-only record of every depot manifest (gid) change seen by
+comprehensive-manifest.py, so "what changed since yesterday" does not
+need a full regeneration.
+
+Storage is columnar, one fixed-width file per column under history/:
+
+    appid.u32  depot.u32  gid.u64  change.u32  ts.f64  prev.u64
+
+Rows are appended in timestamp order, so "changed since T" is a binary
+search on ts.f64 followed by a scan of the tail. prev.u64 links each row
+to the depot's previous row, so a depot's history is a pointer walk.
+latest.idx snapshots depot -> newest row (written on close); on open
+only the rows added after the snapshot are scanned. Columns are mmapped for reading.
+
+Appends hold an OS lock on history/.lock and first pick up rows other
+processes appended, so concurrent comprehensive-manifest.py runs keep
+the columns aligned and ts sorted. Threads should share the instance
+returned by get_store().
+
+Usage:
+    python manifest_history.py since <hours|ISO date> [--app AppID]
+    python manifest_history.py depot <DepotID>
+    python manifest_history.py stats
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from file_lock import FileLock
+
+HISTORY_DIR = Path("history")
+NO_ROW = 0xFFFFFFFFFFFFFFFF
+COLUMNS = (
+    ("appid", "I"),
+    ("depot", "I"),
+    ("gid", "Q"),
+    ("change", "I"),
+    ("ts", "d"),
+    ("prev", "Q"),
+)
+EXTENSIONS = {"I": "u32", "Q": "u64", "d": "f64"}
+LATEST = struct.Struct("<IQ")
+
+
+class HistoryStore:
+    def __init__(self, root: Path = HISTORY_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.paths = {name: self.root / f"{name}.{EXTENSIONS[code]}" for name, code in COLUMNS}
+        self.latest: Dict[int, int] = {}
+        self._views: Dict[str, memoryview] = {}
+        self._maps: List[mmap.mmap] = []
+        self.file_lock = FileLock(self.root / ".lock")
+        with self.file_lock:
+            self.rows = self._repair()
+            self._load_latest()
+
+    # ── storage ────────────────────────────────────────────────────────
+
+    def _repair(self) -> int:
+        """Trim columns to the shortest one (a crash mid-append); file lock held"""
+        counts = []
+        for name, code in COLUMNS:
+            path = self.paths[name]
+            size = path.stat().st_size if path.exists() else 0
+            counts.append(size // array(code).itemsize)
+        rows = min(counts)
+        for name, code in COLUMNS:
+            path = self.paths[name]
+            if not path.exists():
+                path.touch()
+            elif path.stat().st_size != rows * array(code).itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * array(code).itemsize)
+        return rows
+
+    def _column(self, name: str) -> memoryview:
+        """mmapped, typed view of a column (re-mapped after appends)"""
+        view = self._views.get(name)
+        if view is not None and len(view) == self.rows:
+            return view
+        code = dict(COLUMNS)[name]
+        if self.rows == 0:
+            return memoryview(array(code))
+        with open(self.paths[name], "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        view = memoryview(mapped)[:self.rows * array(code).itemsize].cast(code)
+        self._views[name] = view
+        return view
+
+    def _release_views(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass    # a caller still holds a slice; it is closed when that goes away
+        self._maps.clear()
+
+    def close(self) -> None:
+        with self.lock, self.file_lock:
+            self._catch_up()
+            self._save_latest()
+        self._release_views()
+
+    def _catch_up(self) -> None:
+        """Index rows other processes appended since we last looked (locks held)"""
+        rows = self._repair()
+        if rows == self.rows:
+            return
+        self._release_views()
+        start = self.rows if rows > self.rows else 0
+        if start == 0:
+            self.latest = {}
+        self.rows = rows
+        depots = self._column("depot")
+        for row in range(start, rows):
+            self.latest[depots[row]] = row
+
+    def refresh(self) -> None:
+        """Make rows written by other processes visible to queries"""
+        with self.lock, self.file_lock:
+            self._catch_up()
+
+    def _load_latest(self) -> None:
+        index_file = self.root / "latest.idx"
+        covered = 0
+        if index_file.exists():
+            data = index_file.read_bytes()
+            covered = struct.unpack_from("<Q", data)[0]
+            if covered <= self.rows:
+                for depot, row in LATEST.iter_unpack(data[8:]):
+                    self.latest[depot] = row
+            else:
+                covered, self.latest = 0, {}
+        depots = self._column("depot")
+        for row in range(covered, self.rows):
+            self.latest[depots[row]] = row
+        if covered != self.rows:
+            self._save_latest()
+
+    def _save_latest(self) -> None:
+        tmp = self.root / "latest.idx.tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("<Q", self.rows))
+            for depot in sorted(self.latest):
+                f.write(LATEST.pack(depot, self.latest[depot]))
+        os.replace(tmp, self.root / "latest.idx")
+
+    # ── writes ─────────────────────────────────────────────────────────
+
+    def record(self, app_id: int, depots: Dict, change: int = 0,
+               timestamp: Optional[float] = None) -> int:
+        """Append a row for every depot whose gid differs from its latest row.
+
+        depots maps depot id -> manifest gid (int or decimal string); depots
+        without a gid or with one that does not fit the columns are skipped.
+        Returns the number of rows appended.
+        """
+        rows = _valid_rows(depots)
+        with self.lock, self.file_lock:
+            self._catch_up()
+            gids = self._column("gid")
+            ts_col = self._column("ts")
+            now = timestamp if timestamp is not None else time.time()
+            if self.rows:
+                now = max(now, ts_col[self.rows - 1])   # keep ts sorted
+
+            # Pointers are only published once every column has its rows
+            new_rows = {name: array(code) for name, code in COLUMNS}
+            latest = {}
+            for depot_id, gid in rows:
+                prev = self.latest.get(depot_id, NO_ROW)
+                if prev != NO_ROW and gids[prev] == gid:
+                    continue
+                for name, value in (("appid", app_id), ("depot", depot_id), ("gid", gid),
+                                    ("change", change), ("ts", now), ("prev", prev)):
+                    new_rows[name].append(value)
+                latest[depot_id] = self.rows + len(new_rows["depot"]) - 1
+
+            added = len(new_rows["depot"])
+            if not added:
+                return 0
+            self._release_views()
+            for name, _code in COLUMNS:
+                with open(self.paths[name], "ab") as f:
+                    new_rows[name].tofile(f)
+            self.rows += added
+            self.latest.update(latest)
+            return added
+
+    # ── queries ────────────────────────────────────────────────────────
+
+    def _row(self, row: int) -> Dict:
+        return {name: self._column(name)[row] for name, _code in COLUMNS if name != "prev"}
+
+    def latest_for(self, depot_id: int) -> Optional[Dict]:
+        row = self.latest.get(depot_id)
+        return None if row is None else self._row(row)
+
+    def history(self, depot_id: int, limit: Optional[int] = None) -> List[Dict]:
+        """Newest-first list of a depot's gid changes"""
+        prev = self._column("prev")
+        out = []
+        row = self.latest.get(depot_id, NO_ROW)
+        while row != NO_ROW and (limit is None or len(out) < limit):
+            out.append(self._row(row))
+            row = prev[row]
+        return out
+
+    def changed_since(self, since: float, app_id: Optional[int] = None,
+                      latest_only: bool = True) -> List[Dict]:
+        """Depots whose gid changed at or after `since` (epoch seconds)"""
+        ts = self._column("ts")
+        start = bisect_left(ts, since)
+        appids = self._column("appid")
+        depots = self._column("depot")
+        out = []
+        for row in range(start, self.rows):
+            if app_id is not None and appids[row] != app_id:
+                continue
+            if latest_only and self.latest.get(depots[row]) != row:
+                continue
+            out.append(self._row(row))
+        return out
+
+    def stats(self) -> Dict:
+        ts = self._column("ts")
+        return {"rows": self.rows, "depots": len(self.latest),
+                "first": ts[0] if self.rows else None,
+                "last": ts[self.rows - 1] if self.rows else None}
+
+
+_shared: Dict[Path, HistoryStore] = {}
+_shared_lock = threading.Lock()
+
+
+def _valid_rows(depots: Dict) -> List:
+    """Sorted (depot, gid) pairs that fit the u32/u64 columns; a bad
+    depot_data_<id>.txt value is reported and skipped"""
+    rows = []
+    for key, value in depots.items():
+        if value in (None, ""):
+            continue
+        try:
+            depot_id, gid = int(key), int(value)
+        except (TypeError, ValueError):
+            depot_id = gid = -1
+        if not (0 <= depot_id < 1 << 32 and 0 <= gid < 1 << 64):
+            print(f"  ⚠ Depot {key}: invalid manifest ID {value!r} (not recorded in history)")
+            continue
+        rows.append((depot_id, gid))
+    return sorted(rows)
+
+
+def get_store(root: Path = HISTORY_DIR) -> HistoryStore:
+    """Process-wide store per directory, so writer threads share one lock
+    and one latest-pointer index; latest.idx is written at exit"""
+    key = Path(root).resolve()
+    with _shared_lock:
+        store = _shared.get(key)
+        if store is None:
+            import atexit
+            store = _shared[key] = HistoryStore(root)
+            atexit.register(store.close)
+        return store
+
+
+def _parse_since(value: str) -> float:
+    if value.endswith("h") and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * 3600
+    if value.replace(".", "", 1).isdigit():
+        return time.time() - float(value) * 3600
+    from datetime import datetime
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _format_row(row: Dict) -> str:
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["ts"]))
+    change = f" change {row['change']}" if row["change"] else ""
+    return f"  {when}  app {row['appid']:>8}  depot {row['depot']:>8}  gid {row['gid']}{change}"
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args or args[0] not in ("since", "depot", "stats") or (args[0] != "stats" and len(args) < 2):
+        print("Usage: python manifest_history.py since <hours|ISO date> [--app AppID] | "
+              "depot <DepotID> | stats")
+        sys.exit(1)
+
+    store = HistoryStore()
+    command = args[0]
+    if command == "stats":
+        stats = store.stats()
+        print(f"📊 {stats['rows']} changes across {stats['depots']} depots")
+    elif command == "depot":
+        rows = store.history(int(args[1]))
+        print(f"📜 Depot {args[1]}: {len(rows)} change(s)")
+        for row in rows:
+            print(_format_row(row))
+    elif command == "since":
+        app_id = int(args[args.index("--app") + 1]) if "--app" in args else None
+        rows = store.changed_since(_parse_since(args[1]), app_id)
+        print(f"🆕 {len(rows)} depot(s) changed")
+        for row in rows:
+            print(_format_row(row))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
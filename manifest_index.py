@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Lua Manifest Index
+Parses the addappid/addtoken subset of every manifest in manifests/ and
+lua_game/ and keeps a persistent, incrementally refreshed index of
+appid -> depots/DLCs/tokens and depot -> owner apps.
+
+Usage:
+    python manifest_index.py stats
+    python manifest_index.py app <AppID>
+    python manifest_index.py depot <DepotID>
+    python manifest_index.py stale [--days N]
+    python manifest_index.py rebuild
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MANIFEST_DIRS = ("manifests", "lua_game")
+INDEX_FILE = Path(".manifest_index.json")
+INDEX_VERSION = 2
+
+# A comment line, or addappid(123) / addappid(123, 1, "hash") / addtoken(123, "token")
+LINE_PATTERN = re.compile(
+    r'^\s*(?:--(.*)|(addappid|addtoken)\s*\(\s*(\d+)\s*'
+    r'(?:,\s*(\d+)\s*)?(?:,\s*"([^"]*)"\s*)?\))',
+    re.MULTILINE,
+)
+# Section headers: "-- DLC Depots (6)", "-- DLC & BONUS CONTENT" / "-- BASE GAME DEPOTS"
+DLC_SECTION = re.compile(r"\bDLCs?\b", re.IGNORECASE)
+DEPOT_SECTION = re.compile(r"\bdepots?\b|\bbase game\b", re.IGNORECASE)
+
+
+def parse_lua(text: str) -> Dict:
+    """Parse one manifest into {appid, depots, dlcs, tokens, split}.
+
+    The first addappid() is the main game. After it, section comments decide
+    what the following addappid() calls are: anything under a comment naming
+    DLCs is a DLC app, anything under one naming depots or the base game is
+    a depot (hash or not). An id with an addtoken() is always a DLC app.
+    Files without section comments fall back to "hash -> depot, bare -> DLC"
+    and are marked split="guessed". Commented-out calls are ignored because
+    the pattern is anchored to the start of the line.
+    """
+    appid: Optional[int] = None
+    section: Optional[str] = None
+    guessed = False
+    depots: Dict[str, str] = {}
+    dlcs: List[int] = []
+    tokens: Dict[str, str] = {}
+
+    for match in LINE_PATTERN.finditer(text):
+        comment, func, ident, _flag, value = match.groups()
+        if comment is not None:
+            if appid is not None:       # header lines like "-- DLC: None" don't count
+                if DLC_SECTION.search(comment):
+                    section = "dlc"
+                elif DEPOT_SECTION.search(comment):
+                    section = "depot"
+            continue
+        ident_int = int(ident)
+        if func == "addtoken":
+            tokens[ident] = value or ""
+        elif appid is None:
+            appid = ident_int
+        elif ident_int == appid:
+            continue
+        elif section == "depot" or (section is None and value):
+            depots[ident] = value or ""
+            guessed = guessed or section is None
+        elif ident_int not in dlcs:
+            dlcs.append(ident_int)
+            guessed = guessed or section is None
+
+    for ident in tokens:
+        if ident in depots:
+            del depots[ident]
+            dlcs.append(int(ident))
+    return {"appid": appid, "depots": depots, "dlcs": dlcs, "tokens": tokens,
+            "split": "guessed" if guessed else "sections"}
+
+
+def _scan_lua_files(dirs: Iterable[Path]) -> Dict[str, os.stat_result]:
+    """Single-pass directory listing of *.lua files with their stat info"""
+    found = {}
+    for directory in dirs:
+        if not directory.is_dir():
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".lua"):
+                    found[entry.path] = entry.stat()
+    return found
+
+
+class ManifestIndex:
+    def __init__(self, root: Path = Path("."), index_file: Optional[Path] = None):
+        self.root = Path(root)
+        self.index_file = index_file or (self.root / INDEX_FILE)
+        self.files: Dict[str, Dict] = {}
+        self._by_app: Dict[int, List[str]] = {}
+        self._by_depot: Dict[int, List[int]] = {}
+
+    # ── persistence ────────────────────────────────────────────────────
+
+    def load(self) -> "ManifestIndex":
+        """Load the on-disk index (if any) and refresh changed files"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    self.files = data.get("files", {})
+            except (OSError, ValueError):
+                self.files = {}
+        changed = self.refresh()
+        if changed or not self.index_file.exists():
+            self.save()
+        return self
+
+    def save(self) -> None:
+        tmp = self.index_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f,
+                      separators=(",", ":"))
+        os.replace(tmp, self.index_file)
+
+    def refresh(self) -> int:
+        """Re-parse only files whose mtime/size changed; drop deleted ones.
+
+        Returns the number of files added, updated or removed.
+        """
+        on_disk = _scan_lua_files(self.root / d for d in MANIFEST_DIRS)
+        changed = 0
+
+        for path in list(self.files):
+            if path not in on_disk:
+                del self.files[path]
+                changed += 1
+
+        for path, st in on_disk.items():
+            entry = self.files.get(path)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                continue
+            try:
+                with open(path, encoding="utf-8-sig", errors="replace") as f:
+                    parsed = parse_lua(f.read())
+            except OSError as e:
+                print(f"  ✗ Cannot read {path}: {e}")
+                continue
+            parsed["mtime_ns"] = st.st_mtime_ns
+            parsed["size"] = st.st_size
+            self.files[path] = parsed
+            changed += 1
+
+        self._rebuild_lookups()
+        return changed
+
+    def _rebuild_lookups(self) -> None:
+        by_app: Dict[int, List[str]] = {}
+        by_depot: Dict[int, List[int]] = {}
+        for path, entry in self.files.items():
+            appid = entry["appid"]
+            if appid is None:
+                continue
+            by_app.setdefault(appid, []).append(path)
+            for ident in list(entry["depots"]) + entry["dlcs"]:
+                owners = by_depot.setdefault(int(ident), [])
+                if appid not in owners:
+                    owners.append(appid)
+        self._by_app = by_app
+        self._by_depot = by_depot
+
+    # ── queries ────────────────────────────────────────────────────────
+
+    def app(self, app_id: int) -> Optional[Dict]:
+        """Merged depots/DLCs/tokens for an app across all its manifest files.
+
+        split is "guessed" when any file lacked section comments, i.e. the
+        depot/DLC division is only a heuristic.
+        """
+        paths = self._by_app.get(app_id)
+        if not paths:
+            return None
+        result = {"appid": app_id, "files": sorted(paths), "depots": {}, "dlcs": [], "tokens": {},
+                  "split": "sections"}
+        for path in result["files"]:
+            entry = self.files[path]
+            if entry["split"] != "sections":
+                result["split"] = "guessed"
+            result["depots"].update({int(k): v for k, v in entry["depots"].items()})
+            result["tokens"].update({int(k): v for k, v in entry["tokens"].items()})
+            for dlc in entry["dlcs"]:
+                if dlc not in result["dlcs"]:
+                    result["dlcs"].append(dlc)
+        return result
+
+    def owners(self, depot_id: int) -> List[int]:
+        """AppIDs whose manifests reference this depot or DLC id"""
+        return list(self._by_depot.get(depot_id, ()))
+
+    def stale(self, max_age_days: float, now: Optional[float] = None) -> List[int]:
+        """AppIDs whose newest manifest file is older than max_age_days"""
+        cutoff_ns = int(((now if now is not None else time.time()) - max_age_days * 86400) * 1e9)
+        newest: Dict[int, int] = {}
+        for entry in self.files.values():
+            appid = entry["appid"]
+            if appid is not None:
+                newest[appid] = max(newest.get(appid, 0), entry["mtime_ns"])
+        return sorted(appid for appid, mtime in newest.items() if mtime < cutoff_ns)
+
+    def app_ids(self) -> List[int]:
+        return sorted(self._by_app)
+
+    def stats(self) -> Dict:
+        return {
+            "files": len(self.files),
+            "apps": len(self._by_app),
+            "depots": len(self._by_depot),
+        }
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args or args[0] not in ("stats", "app", "depot", "stale", "rebuild"):
+        print("Usage: python manifest_index.py stats|app <AppID>|depot <DepotID>|stale [--days N]|rebuild")
+        print("Example: python manifest_index.py depot 2947441")
+        sys.exit(1)
+
+    command = args[0]
+    started = time.perf_counter()
+    index = ManifestIndex()
+    if command == "rebuild":
+        if index.index_file.exists():
+            index.index_file.unlink()
+    index.load()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    if command in ("stats", "rebuild"):
+        stats = index.stats()
+        print(f"📊 {stats['files']} files, {stats['apps']} apps, {stats['depots']} depots/DLCs "
+              f"(loaded in {load_ms:.1f} ms)")
+    elif command == "app":
+        info = index.app(int(args[1]))
+        if not info:
+            print(f"❌ AppID {args[1]} not found in index")
+            sys.exit(1)
+        print(json.dumps(info, indent=2))
+    elif command == "depot":
+        owners = index.owners(int(args[1]))
+        if not owners:
+            print(f"❌ Depot {args[1]} not referenced by any manifest")
+            sys.exit(1)
+        print(f"Depot {args[1]} → apps: {', '.join(map(str, owners))}")
+    elif command == "stale":
+        days = float(args[args.index("--days") + 1]) if "--days" in args else 7.0
+        stale = index.stale(days)
+        print(f"⚠ {len(stale)} app(s) older than {days:g} days")
+        for appid in stale:
+            print(f"  {appid}")
+
+
+if __name__ == "__main__":
+    main()
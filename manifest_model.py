@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Compact Manifest Data Model
+Array-backed storage for depots, DLCs and app tokens, so thousands of
+apps can be held in one process (scheduler, lookup service) cheaply.
+
+    depots  -> array('I') depot ids, array('Q') manifest gids, 32-byte raw
+               SHA256 digests packed into one bytearray
+    dlcs    -> sorted array('I')
+    tokens  -> array('I') app ids + array('Q') tokens
+
+A gid of 0 / an all-zero digest means "unknown", replacing the "" and
+None placeholders of the dict representation.
+
+Usage:
+    python manifest_model.py --measure [Depots]
+"""
+
+import hashlib
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+DIGEST_SIZE = 32
+NO_DIGEST = bytes(DIGEST_SIZE)
+
+
+def depot_digest(depot_id: int, gid: int) -> bytes:
+    """Same value calculate_hashes() writes, as raw bytes"""
+    return hashlib.sha256(f"{depot_id}:{gid}".encode()).digest()
+
+
+def _gid(value, depot_id: int = 0) -> int:
+    """Manifest gid as uint64; anything unparsable is 0 (unknown) rather
+    than an error, so one bad cache/override entry cannot abort a run"""
+    if value in (None, ""):
+        return 0
+    try:
+        gid = int(value)
+    except (TypeError, ValueError):
+        gid = -1
+    if not 0 <= gid < 1 << 64:
+        print(f"  ⚠ Depot {depot_id}: invalid manifest ID {value!r} (will use without hash)")
+        return 0
+    return gid
+
+
+def _token(app_id, value) -> Optional[Tuple[int, int]]:
+    """(app id, token) as uint32/uint64, or None with a warning; the token
+    is dropped rather than aborting generate_lua() over one cache entry"""
+    try:
+        pair = int(app_id), int(value)
+    except (TypeError, ValueError):
+        pair = -1, -1
+    if not (0 <= pair[0] < 1 << 32 and 0 <= pair[1] < 1 << 64):
+        print(f"  ⚠ App {app_id}: invalid token {value!r} (dropped)")
+        return None
+    return pair
+
+
+class _SortedIds:
+    """Sorted uint32 key column with bisect lookup"""
+    __slots__ = ("ids",)
+
+    def __init__(self):
+        self.ids = array("I")
+
+    def find(self, key: int) -> Tuple[int, bool]:
+        pos = bisect_left(self.ids, key)
+        return pos, pos < len(self.ids) and self.ids[pos] == key
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: int) -> bool:
+        return self.find(key)[1]
+
+
+class DepotTable(_SortedIds):
+    __slots__ = ("gids", "digests")
+
+    def __init__(self):
+        super().__init__()
+        self.gids = array("Q")
+        self.digests = bytearray()
+
+    def set(self, depot_id: int, gid: int, digest: bytes = NO_DIGEST) -> None:
+        pos, found = self.find(depot_id)
+        if found:
+            self.gids[pos] = gid
+            self.digests[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE] = digest
+        else:
+            self.ids.insert(pos, depot_id)
+            self.gids.insert(pos, gid)
+            self.digests[pos * DIGEST_SIZE:pos * DIGEST_SIZE] = digest
+
+    def get(self, depot_id: int) -> Optional[Tuple[int, bytes]]:
+        pos, found = self.find(depot_id)
+        if not found:
+            return None
+        return self.gids[pos], bytes(self.digests[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE])
+
+    def hash_all(self) -> int:
+        """Fill digests for every depot with a known gid; returns how many"""
+        count = 0
+        for pos, (depot_id, gid) in enumerate(zip(self.ids, self.gids)):
+            if gid:
+                self.digests[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE] = depot_digest(depot_id, gid)
+                count += 1
+        return count
+
+    def __iter__(self) -> Iterator[Tuple[int, int, bytes]]:
+        digests = memoryview(self.digests)
+        for pos, (depot_id, gid) in enumerate(zip(self.ids, self.gids)):
+            yield depot_id, gid, bytes(digests[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE])
+
+
+class DlcSet(_SortedIds):
+    __slots__ = ()
+
+    def add(self, dlc_id: int) -> None:
+        pos, found = self.find(dlc_id)
+        if not found:
+            self.ids.insert(pos, dlc_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+
+class TokenTable(_SortedIds):
+    __slots__ = ("tokens",)
+
+    def __init__(self):
+        super().__init__()
+        self.tokens = array("Q")
+
+    def set(self, app_id: int, token: int) -> None:
+        pos, found = self.find(app_id)
+        if found:
+            self.tokens[pos] = token
+        else:
+            self.ids.insert(pos, app_id)
+            self.tokens.insert(pos, token)
+
+    def get(self, app_id: int) -> Optional[int]:
+        pos, found = self.find(app_id)
+        return self.tokens[pos] if found else None
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.ids, self.tokens)
+
+
+class AppManifest:
+    __slots__ = ("app_id", "name", "depots", "dlcs", "tokens")
+
+    def __init__(self, app_id: int, name: str = ""):
+        self.app_id = app_id
+        self.name = name
+        self.depots = DepotTable()
+        self.dlcs = DlcSet()
+        self.tokens = TokenTable()
+
+    # ── conversion from/to the generator's dicts ───────────────────────
+
+    @classmethod
+    def from_dicts(cls, app_id: int, name: str = "", depots: Dict = None,
+                   dlcs: Iterable = (), tokens: Dict = None, hashes: Dict = None) -> "AppManifest":
+        """Build from SteamManifestGenerator-style dicts (int or str keys,
+        decimal-string manifest ids, hex hashes)"""
+        model = cls(app_id, name)
+        hashes = {int(k): v for k, v in (hashes or {}).items()}
+        for depot_id, manifest_id in (depots or {}).items():
+            depot_id = int(depot_id)
+            digest = bytes.fromhex(hashes[depot_id]) if depot_id in hashes else NO_DIGEST
+            gid = _gid(manifest_id, depot_id)
+            model.depots.set(depot_id, gid, digest if gid else NO_DIGEST)
+        for dlc_id in dlcs:
+            model.dlcs.add(int(dlc_id))
+        for token_app, token in (tokens or {}).items():
+            pair = _token(token_app, token)
+            if pair is not None:
+                model.tokens.set(*pair)
+        return model
+
+    @classmethod
+    def from_generator(cls, generator) -> "AppManifest":
+        return cls.from_dicts(generator.app_id, generator.game_name, generator.depots,
+                              generator.dlcs, generator.tokens, generator.hashes)
+
+    def to_dicts(self) -> Dict:
+        """Inverse of from_dicts(); gid 0 becomes "" like the override table"""
+        return {
+            "depots": {d: str(g) if g else "" for d, g, _ in self.depots},
+            "dlcs": {d: None for d in self.dlcs},
+            "tokens": {a: str(t) for a, t in self.tokens},
+            "hashes": {d: h.hex() for d, g, h in self.depots if h != NO_DIGEST},
+        }
+
+    # ── emitters ───────────────────────────────────────────────────────
+
+    def to_json(self) -> Dict:
+        """Same shape method5_cache_lookup() reads from manifests/<appid>.json"""
+        return {
+            "appid": self.app_id,
+            "name": self.name,
+            "depots": {str(d): str(g) if g else "" for d, g, _ in self.depots},
+            "dlcs": list(self.dlcs),
+            "tokens": {str(a): str(t) for a, t in self.tokens},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "AppManifest":
+        return cls.from_dicts(int(data["appid"]), data.get("name", ""), data.get("depots"),
+                              data.get("dlcs", ()), data.get("tokens"))
+
+    def depot_lines(self) -> Iterator[str]:
+        for depot_id, gid, digest in self.depots:
+            if gid and digest != NO_DIGEST:
+                yield f"addappid({depot_id}, 1, \"{digest.hex()}\")"
+            else:
+                yield f"addappid({depot_id})"
+
+    def dlc_lines(self) -> Iterator[str]:
+        for dlc_id in self.dlcs:
+            yield f"addappid({dlc_id})"
+            token = self.tokens.get(dlc_id)
+            if token is not None:
+                yield f"addtoken({dlc_id}, \"{token}\")"
+
+    def __repr__(self) -> str:
+        return (f"AppManifest({self.app_id}, depots={len(self.depots)}, "
+                f"dlcs={len(self.dlcs)}, tokens={len(self.tokens)})")
+
+
+def measure(depot_count: int = 10000, per_app: int = 4) -> Dict[str, int]:
+    """Bytes allocated to hold depot_count depots as dicts vs. the model"""
+    import tracemalloc
+
+    apps = depot_count // per_app
+
+    def build_dicts():
+        out = []
+        for a in range(apps):
+            app_id = 1000000 + a * 10
+            depots = {app_id + i: str(4962893632385854811 + a + i) for i in range(1, per_app + 1)}
+            hashes = {d: hashlib.sha256(f"{d}:{m}".encode()).hexdigest() for d, m in depots.items()}
+            out.append((depots, {app_id + 100 + i: None for i in range(per_app)}, {}, hashes))
+        return out
+
+    def build_models():
+        out = []
+        for a in range(apps):
+            app_id = 1000000 + a * 10
+            model = AppManifest(app_id)
+            for i in range(1, per_app + 1):
+                model.depots.set(app_id + i, 4962893632385854811 + a + i)
+                model.dlcs.add(app_id + 100 + i - 1)
+            model.depots.hash_all()
+            out.append(model)
+        return out
+
+    results = {}
+    for label, build in (("dicts", build_dicts), ("model", build_models)):
+        tracemalloc.start()
+        held = build()
+        results[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+    return results
+
+
+def main():
+    if "--measure" not in sys.argv:
+        print("Usage: python manifest_model.py --measure [Depots]")
+        sys.exit(1)
+    args = [a for a in sys.argv[1:] if a != "--measure"]
+    count = int(args[0]) if args else 10000
+    results = measure(count)
+    print(f"📊 Memory for {count} depots (+ DLCs, hashes):")
+    for label, size in results.items():
+        print(f"  {label:6s} {size / 1024:9.1f} KiB  ({size / count:6.1f} B/depot)")
+    print(f"  saving {1 - results['model'] / results['dicts']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Shared Manifest Work Queue
+Lets several worker processes / machines split a catalog refresh. Work
+lives in one SQLite file on shared disk; each worker leases a few AppIDs
+at a time, keeps the lease alive while SteamManifestGenerator runs, then
+writes manifests/<AppID>.lua and marks the job done.
+
+  * leases expire, so jobs held by a crashed worker are picked up again;
+    a job whose lease ran out MAX_ATTEMPTS times is marked failed instead
+    (it probably crashes its worker)
+  * results are written atomically (tmp + rename) and only when the
+    content changed, so a job finished twice gives the same file
+  * a worker that lost its lease cannot overwrite the job's state
+
+Usage:
+    python manifest_queue.py init [--games games.json] [--db queue.db]
+    python manifest_queue.py worker [--id NAME] [--lease 300] [--batch 1] [--offline]
+    python manifest_queue.py spawn <N> [--batch 1] [--offline]   # N local workers
+    python manifest_queue.py status [--db queue.db]
+    python manifest_queue.py requeue [--db queue.db]    # done/failed -> pending
+"""
+
+import hashlib
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_DB = "manifest_queue.db"
+OUTPUT_DIR = Path("manifests")
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    appid         INTEGER PRIMARY KEY,
+    name          TEXT NOT NULL DEFAULT '',
+    state         TEXT NOT NULL DEFAULT 'pending',  -- pending|leased|done|failed
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result_sha256 TEXT,
+    error         TEXT,
+    finished_by   TEXT,
+    updated_at    REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+
+def write_result(app_id: int, lua: str, output_dir: Path = OUTPUT_DIR) -> Tuple[str, bool]:
+    """Idempotent write of manifests/<appid>.lua; returns (sha256, changed)"""
+    data = lua.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    output_dir.mkdir(exist_ok=True)
+    out_file = output_dir / f"{app_id}.lua"
+    try:
+        if hashlib.sha256(out_file.read_bytes()).hexdigest() == digest:
+            return digest, False
+    except OSError:
+        pass
+    tmp = out_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, out_file)
+    return digest, True
+
+
+class WorkQueue:
+    def __init__(self, path: str = DEFAULT_DB, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        # Autocommit; every state change is an explicit BEGIN IMMEDIATE
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None,
+                                  check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.executescript(SCHEMA)
+
+    def _tx(self, fn):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.db)
+                self.db.execute("COMMIT")
+                return result
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    # ── producer side ──────────────────────────────────────────────────
+
+    def enqueue(self, apps: Iterable[Tuple[int, str]]) -> int:
+        rows = [(int(a), n or "", self.clock()) for a, n in apps]
+        return self._tx(lambda db: db.executemany(
+            "INSERT OR IGNORE INTO jobs (appid, name, updated_at) VALUES (?, ?, ?)", rows
+        ).rowcount)
+
+    def requeue(self) -> int:
+        return self._tx(lambda db: db.execute(
+            "UPDATE jobs SET state='pending', owner=NULL, lease_expires=NULL, "
+            "attempts=0, error=NULL WHERE state IN ('done', 'failed')").rowcount)
+
+    # ── worker side ────────────────────────────────────────────────────
+
+    def claim(self, worker: str, count: int = 1, lease: float = 300,
+              max_attempts: int = MAX_ATTEMPTS) -> List[Tuple[int, str]]:
+        """Lease up to `count` jobs: pending ones, or leased ones whose lease ran out"""
+        now = self.clock()
+
+        def claim_tx(db):
+            db.execute(
+                "UPDATE jobs SET state='failed', owner=NULL, lease_expires=NULL, "
+                "error='lease expired ' || attempts || ' times', updated_at=? "
+                "WHERE state='leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, max_attempts))
+            rows = db.execute(
+                "SELECT appid, name FROM jobs "
+                "WHERE state='pending' OR (state='leased' AND lease_expires < ?) "
+                "ORDER BY attempts, appid LIMIT ?", (now, count)).fetchall()
+            db.executemany(
+                "UPDATE jobs SET state='leased', owner=?, lease_expires=?, "
+                "attempts=attempts+1, updated_at=? WHERE appid=?",
+                [(worker, now + lease, now, appid) for appid, _ in rows])
+            return rows
+
+        return self._tx(claim_tx)
+
+    def heartbeat(self, worker: str, app_id: int, lease: float = 300) -> bool:
+        """Extend a lease; False means it was lost to another worker"""
+        now = self.clock()
+        return self._tx(lambda db: db.execute(
+            "UPDATE jobs SET lease_expires=?, updated_at=? "
+            "WHERE appid=? AND owner=? AND state='leased'",
+            (now + lease, now, app_id, worker)).rowcount == 1)
+
+    def complete(self, worker: str, app_id: int, digest: str) -> bool:
+        now = self.clock()
+        return self._tx(lambda db: db.execute(
+            "UPDATE jobs SET state='done', owner=NULL, lease_expires=NULL, "
+            "result_sha256=?, error=NULL, finished_by=?, updated_at=? "
+            "WHERE appid=? AND owner=? AND state='leased'",
+            (digest, worker, now, app_id, worker)).rowcount == 1)
+
+    def fail(self, worker: str, app_id: int, error: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        now = self.clock()
+        self._tx(lambda db: db.execute(
+            "UPDATE jobs SET state=CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner=NULL, lease_expires=NULL, error=?, updated_at=? "
+            "WHERE appid=? AND owner=? AND state='leased'",
+            (max_attempts, error[:500], now, app_id, worker)))
+
+    # ── progress ───────────────────────────────────────────────────────
+
+    def progress(self) -> Dict:
+        with self.lock:
+            states = dict(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+            workers = dict(self.db.execute(
+                "SELECT finished_by, COUNT(*) FROM jobs WHERE state='done' GROUP BY finished_by"))
+            active = dict(self.db.execute(
+                "SELECT owner, COUNT(*) FROM jobs WHERE state='leased' AND lease_expires >= ? "
+                "GROUP BY owner", (self.clock(),)))
+        total = sum(states.values())
+        return {"total": total, "states": states, "done_by": workers, "active": active,
+                "percent": round(100 * states.get("done", 0) / total, 1) if total else 0.0}
+
+    def remaining(self) -> int:
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+
+def run_worker(queue: WorkQueue, worker: str,
+               job: Callable[[int, str], str],
+               lease: float = 300, batch: int = 1,
+               output_dir: Path = OUTPUT_DIR,
+               idle_sleep: float = 5.0) -> Dict[str, int]:
+    """Claim/run/complete until the queue has nothing pending or leased"""
+    stats = {"done": 0, "failed": 0, "lost": 0}
+    while True:
+        claimed = queue.claim(worker, batch, lease)
+        if not claimed:
+            if queue.remaining() == 0:
+                return stats
+            time.sleep(idle_sleep)   # others hold leases; they may still expire
+            continue
+
+        # One heartbeat thread keeps every not-yet-finished job of the batch leased
+        held = {app_id for app_id, _ in claimed}
+        stop = threading.Event()
+
+        def keep_alive():
+            while not stop.wait(lease / 3):
+                for app_id in list(held):
+                    if not queue.heartbeat(worker, app_id, lease):
+                        held.discard(app_id)
+
+        beat = threading.Thread(target=keep_alive, daemon=True)
+        beat.start()
+        try:
+            for app_id, name in claimed:
+                if app_id not in held:
+                    stats["lost"] += 1
+                    print(f"  ⚠ [{worker}] {app_id} lease lost before it started; skipped")
+                    continue
+                try:
+                    lua = job(app_id, name)
+                    digest, changed = write_result(app_id, lua, output_dir)
+                    held.discard(app_id)
+                    if queue.complete(worker, app_id, digest):
+                        stats["done"] += 1
+                        print(f"  ✓ [{worker}] {app_id} {'written' if changed else 'unchanged'}")
+                    else:
+                        stats["lost"] += 1
+                        print(f"  ⚠ [{worker}] {app_id} lease lost; result kept, state untouched")
+                except Exception as e:
+                    held.discard(app_id)
+                    queue.fail(worker, app_id, str(e))
+                    stats["failed"] += 1
+                    print(f"  ✗ [{worker}] {app_id}: {e}")
+        finally:
+            stop.set()
+            beat.join()
+
+
+def _render_job(offline: bool) -> Callable[[int, str], str]:
+    def job(app_id: int, name: str) -> str:
+        from manifest_service import render_manifest
+        return render_manifest(app_id, offline=offline)
+    return job
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    commands = ("init", "worker", "spawn", "status", "requeue")
+    if not args or args[0] not in commands:
+        print("Usage: python manifest_queue.py init|worker|spawn <N>|status|requeue "
+              "[--db queue.db] [--games games.json] [--id NAME] [--lease 300] [--batch 1] "
+              "[--offline]")
+        sys.exit(1)
+
+    command = args[0]
+    db_path = option("--db", DEFAULT_DB)
+    queue = WorkQueue(db_path)
+
+    if command == "init":
+        import json
+        with open(option("--games", "games.json"), encoding="utf-8") as f:
+            games = json.load(f)
+        added = queue.enqueue((g["appId"], g.get("name", "")) for g in games)
+        print(f"📥 Queued {added} new app(s) in {db_path}")
+    elif command == "requeue":
+        print(f"🔁 Requeued {queue.requeue()} job(s)")
+    elif command == "status":
+        p = queue.progress()
+        print(f"📊 {p['percent']}% done of {p['total']} — " +
+              ", ".join(f"{k}: {v}" for k, v in sorted(p["states"].items())))
+        for worker, count in sorted(p["done_by"].items()):
+            print(f"  {worker}: {count} done, {p['active'].get(worker, 0)} active")
+    elif command == "worker":
+        worker = option("--id", f"{socket.gethostname()}-{os.getpid()}")
+        print(f"👷 Worker {worker} started on {db_path}")
+        stats = run_worker(queue, worker, _render_job("--offline" in args),
+                           lease=float(option("--lease", 300)),
+                           batch=int(option("--batch", 1)))
+        print(f"✅ Worker {worker} finished: {stats}")
+    elif command == "spawn":
+        import subprocess
+        count = int(args[1]) if len(args) > 1 and args[1].isdigit() else 2
+        passthrough = (["--lease", option("--lease", "300"), "--batch", option("--batch", "1")] +
+                       (["--offline"] if "--offline" in args else []))
+        procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker",
+                                   "--db", db_path, "--id", f"local-{i}"] + passthrough)
+                 for i in range(count)]
+        codes = [p.wait() for p in procs]
+        print(f"🏁 {count} worker(s) exited with {codes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Manifest Refresh Scheduler
+Keeps the catalog fresh by re-running SteamManifestGenerator for the most
+overdue AppIDs, with per-source token-bucket rate limits and a worker pool
+that grows/shrinks with observed latency and errors.
+
+Popular games get a shorter refresh interval: an app is due at
+last_refreshed + max_age / popularity, and the queue is a heap on that
+due time, so the most stale-for-its-popularity app is always first.
+
+Clock, sleep, executor and job runner are all injectable, so the whole
+scheduler can be driven by fake sources and a fake clock.
+
+Usage:
+    python manifest_scheduler.py [--games games.json] [--max-age-hours 24]
+                                 [--workers 4] [--once]
+"""
+
+import heapq
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional
+
+# Sources hit by SteamManifestGenerator, with (tokens per second, burst)
+DEFAULT_RATES = {
+    "steamcmd": (1 / 10, 2),   # one anonymous SteamCMD session every 10s
+    "steamdb": (1 / 5, 3),
+    "steam_api": (1.0, 5),
+}
+
+# Generator methods that talk to each source; the rest are local
+SOURCE_METHODS = (
+    ("steamcmd", "method1_steamcmd"),
+    ("steamdb", "method2_steamdb_api"),
+    ("steam_api", "method3_steam_api"),
+)
+LOCAL_METHODS = (
+    "method4_parse_dlcs",
+    "method5_cache_lookup",
+    "method6_manual_override",
+    "method7_fallback_request",
+)
+
+
+class TokenBucket:
+    """Classic token bucket; refills continuously at `rate` tokens/second"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        with self.lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return True
+            return False
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """Seconds until `amount` tokens will be available"""
+        with self.lock:
+            self._refill()
+            missing = amount - self.tokens
+            return 0.0 if missing <= 0 else missing / self.rate
+
+    def acquire(self, sleep: Callable[[float], None] = time.sleep) -> None:
+        while not self.try_acquire():
+            sleep(self.wait_time())
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: +1 after a window of fast successes, halve on
+    an error or a response slower than target_latency."""
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 8,
+                 target_latency: float = 60.0):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.successes = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        if not ok or latency > self.target_latency:
+            self.limit = max(self.minimum, self.limit // 2)
+            self.successes = 0
+            return
+        self.successes += 1
+        if self.successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self.successes = 0
+
+
+class InlineExecutor:
+    """Executor that runs jobs synchronously; used with fake clocks and --workers 0"""
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+def generate_manifest(app_id: int, game_name: str, acquire: Callable[[str], None]) -> Dict:
+    """Default job: the same steps as run_all_methods(), rate-limited per source"""
+    from steamtools import load_generator
+
+    generator = load_generator()(app_id, game_name)
+    errors = []
+    for source, method in SOURCE_METHODS:
+        acquire(source)
+        result = getattr(generator, method)()
+        if result.get("status") == "error":
+            errors.append(source)
+    for method in LOCAL_METHODS:
+        getattr(generator, method)()
+    generator.calculate_hashes()
+    generator.save_manifest()
+    # Only a total failure counts as an error; one flaky source is normal
+    if len(errors) == len(SOURCE_METHODS) and not generator.depots:
+        raise RuntimeError(f"all sources failed for {app_id}")
+    return {"depots": len(generator.depots), "source_errors": errors}
+
+
+class Scheduler:
+    def __init__(self,
+                 runner: Callable[[int, str, Callable[[str], None]], Dict] = generate_manifest,
+                 rates: Optional[Dict] = None,
+                 max_age: float = 24 * 3600,
+                 retry_delay: float = 300,
+                 max_workers: int = 4,
+                 target_latency: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 executor=None):
+        self.runner = runner
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.buckets = {
+            name: TokenBucket(rate, burst, clock)
+            for name, (rate, burst) in (rates or DEFAULT_RATES).items()
+        }
+        self.concurrency = AdaptiveConcurrency(maximum=max(1, max_workers),
+                                               target_latency=target_latency)
+        if executor is None:
+            if max_workers > 0:
+                from concurrent.futures import ThreadPoolExecutor
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+            else:
+                executor = InlineExecutor()
+        self.executor = executor
+
+        self.apps: Dict[int, Dict] = {}
+        self.heap: List = []
+        self.running: Dict[int, Future] = {}
+        self.stats = {"completed": 0, "failed": 0}
+        self._waited = threading.local()    # per-job seconds spent in acquire()
+
+    # ── queue ──────────────────────────────────────────────────────────
+
+    def add(self, app_id: int, name: str = "", popularity: float = 1.0,
+            last_refreshed: Optional[float] = None) -> None:
+        """Add or update an app; last_refreshed=None means never generated"""
+        app = self.apps.setdefault(app_id, {"failures": 0, "version": 0})
+        app["name"] = name or app.get("name", "")
+        app["popularity"] = max(popularity, 0.01)
+        if last_refreshed is not None or "due" not in app:
+            due = (self.clock() - self.max_age if last_refreshed is None
+                   else last_refreshed + self.max_age / app["popularity"])
+            self._push(app_id, due)
+
+    def _push(self, app_id: int, due: float) -> None:
+        # Entries are invalidated lazily by bumping the app's version
+        app = self.apps[app_id]
+        app["version"] += 1
+        app["due"] = due
+        heapq.heappush(self.heap, (due, -app["popularity"], app_id, app["version"]))
+
+    def _pop_due(self) -> Optional[int]:
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            _due, _prio, app_id, version = heapq.heappop(self.heap)
+            if self.apps[app_id]["version"] == version and app_id not in self.running:
+                return app_id
+        return None
+
+    def take_due(self) -> Deque[int]:
+        """Remove and return every app due now, most overdue first"""
+        now = self.clock()
+        due: Deque[int] = deque()
+        while self.heap and self.heap[0][0] <= now:
+            _due, _prio, app_id, version = heapq.heappop(self.heap)
+            if self.apps[app_id]["version"] == version and app_id not in self.running:
+                due.append(app_id)
+        return due
+
+    def next_due_in(self) -> Optional[float]:
+        while self.heap and self.apps[self.heap[0][2]]["version"] != self.heap[0][3]:
+            heapq.heappop(self.heap)
+        return max(0.0, self.heap[0][0] - self.clock()) if self.heap else None
+
+    # ── dispatch ───────────────────────────────────────────────────────
+
+    def acquire(self, source: str) -> None:
+        bucket = self.buckets.get(source)
+        if bucket is not None:
+            started = self.clock()
+            bucket.acquire(self.sleep)
+            self._waited.seconds += self.clock() - started
+
+    def _run(self, app_id: int):
+        # Latency excludes time blocked on our own rate limits, otherwise
+        # AIMD would shrink the pool because of its own throttling
+        self._waited.seconds = 0.0
+        started = self.clock()
+        try:
+            result = self.runner(app_id, self.apps[app_id]["name"], self.acquire)
+            return True, self.clock() - started - self._waited.seconds, result
+        except Exception as e:
+            return False, self.clock() - started - self._waited.seconds, str(e)
+
+    def _finish(self, app_id: int, future: Future) -> None:
+        ok, latency, detail = future.result()
+        self.concurrency.record(latency, ok)
+        app = self.apps[app_id]
+        now = self.clock()
+        if ok:
+            app["failures"] = 0
+            app["last_refreshed"] = now
+            self.stats["completed"] += 1
+            self._push(app_id, now + self.max_age / app["popularity"])
+            print(f"  ✓ {app_id} refreshed in {latency:.1f}s "
+                  f"(workers: {self.concurrency.limit})")
+        else:
+            app["failures"] += 1
+            self.stats["failed"] += 1
+            backoff = min(self.retry_delay * 2 ** (app["failures"] - 1), self.max_age)
+            self._push(app_id, now + backoff)
+            print(f"  ✗ {app_id} failed ({detail}); retry in {backoff:.0f}s")
+
+    def tick(self, pending: Optional[Deque[int]] = None) -> int:
+        """Reap finished jobs and start due ones up to the concurrency limit.
+        With `pending`, jobs are taken from that queue instead of the heap.
+
+        Returns the number of jobs started.
+        """
+        for app_id, future in list(self.running.items()):
+            if future.done():
+                del self.running[app_id]
+                self._finish(app_id, future)
+
+        started = 0
+        while len(self.running) < self.concurrency.limit:
+            if pending is None:
+                app_id = self._pop_due()
+            else:
+                app_id = pending.popleft() if pending else None
+            if app_id is None:
+                break
+            future = self.executor.submit(self._run, app_id)
+            started += 1
+            if future.done():
+                self._finish(app_id, future)
+            else:
+                self.running[app_id] = future
+        return started
+
+    def run(self, once: bool = False, idle_sleep: float = 1.0) -> None:
+        """Main loop. With once=True, make one pass over the apps due now:
+        each runs once (failures are not retried) and then the loop returns."""
+        pending = self.take_due() if once else None
+        try:
+            while True:
+                self.tick(pending)
+                if once and not pending and not self.running:
+                    break
+                wait = None if once else self.next_due_in()
+                self.sleep(idle_sleep if wait is None or self.running else min(wait, idle_sleep * 60))
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+def load_catalog(scheduler: Scheduler, games_file: str = "games.json") -> int:
+    """Queue every game in games.json. List order is treated as popularity,
+    and the manifest index supplies when each app was last generated."""
+    import json
+    from manifest_index import ManifestIndex
+
+    with open(games_file, encoding="utf-8") as f:
+        games = json.load(f)
+
+    newest: Dict[int, float] = {}
+    index = ManifestIndex().load()
+    for entry in index.files.values():
+        if entry["appid"] is not None:
+            newest[entry["appid"]] = max(newest.get(entry["appid"], 0), entry["mtime_ns"] / 1e9)
+
+    # Map wall-clock mtimes onto the scheduler clock
+    offset = scheduler.clock() - time.time()
+    total = len(games)
+    for position, game in enumerate(games):
+        app_id = int(game["appId"])
+        popularity = 1.0 + 3.0 * (total - position) / total
+        last = newest.get(app_id)
+        scheduler.add(app_id, game.get("name", ""), popularity,
+                      None if last is None else last + offset)
+    return total
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    scheduler = Scheduler(max_age=float(option("--max-age-hours", 24)) * 3600,
+                          max_workers=int(option("--workers", 4)))
+    count = load_catalog(scheduler, option("--games", "games.json"))
+    print(f"🗓  Scheduling {count} apps "
+          f"(max age {scheduler.max_age / 3600:g}h, up to {scheduler.concurrency.maximum} workers)")
+    try:
+        scheduler.run(once="--once" in args)
+    except KeyboardInterrupt:
+        print("\n⏹  Stopped")
+    print(f"📊 Completed: {scheduler.stats['completed']}, failed: {scheduler.stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
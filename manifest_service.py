@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local Manifest Lookup Service
+Small asyncio HTTP server around SteamManifestGenerator so the Node bot
+and api-server.js can fetch a rendered manifest without spawning Python
+for every request.
+
+  * concurrent requests for the same AppID share one in-flight fetch
+  * rendered manifests live in an LRU; stale entries are served at once
+    and refreshed in the background
+  * /health and /metrics expose cache and latency counters
+
+Endpoints:
+    GET /manifest/<AppID>[?refresh=1]   -> Lua text
+    GET /health                         -> JSON
+    GET /metrics                        -> JSON
+
+Usage:
+    python manifest_service.py [--host 127.0.0.1] [--port 8765]
+                               [--ttl 3600] [--cache 1024] [--offline]
+
+--offline stubs the network sources: only the local cache, manual
+overrides and depot_data_<AppID>.txt files are used.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+NETWORK_METHODS = ("method1_steamcmd", "method2_steamdb_api", "method3_steam_api")
+LOCAL_METHODS = ("method4_parse_dlcs", "method5_cache_lookup",
+                 "method6_manual_override", "method7_fallback_request")
+
+
+def render_manifest(app_id: int, offline: bool = False) -> str:
+    """Run the generator methods and return the Lua text (nothing is saved)"""
+    from steamtools import load_generator
+
+    generator = load_generator()(app_id)
+    for method in (LOCAL_METHODS if offline else NETWORK_METHODS + LOCAL_METHODS):
+        getattr(generator, method)()
+    generator.calculate_hashes()
+    return generator.generate_lua()
+
+
+def render_offline(app_id: int) -> str:
+    return render_manifest(app_id, offline=True)
+
+
+class ManifestService:
+    def __init__(self, fetch: Callable[[int], str] = render_manifest,
+                 ttl: float = 3600, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.cache: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        self.inflight: Dict[int, asyncio.Future] = {}
+        self.latencies = deque(maxlen=2048)
+        self.started = clock()
+        self.counters = {
+            "requests": 0, "hits": 0, "stale_hits": 0, "misses": 0,
+            "coalesced": 0, "fetches": 0, "fetch_errors": 0,
+        }
+
+    # ── cache ──────────────────────────────────────────────────────────
+
+    def _store(self, app_id: int, lua: str) -> None:
+        self.cache[app_id] = (lua, self.clock())
+        self.cache.move_to_end(app_id)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def _fetch(self, app_id: int) -> asyncio.Future:
+        """Start (or join) the single in-flight fetch for app_id"""
+        future = self.inflight.get(app_id)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, self.fetch, app_id)
+        self.inflight[app_id] = future
+        self.counters["fetches"] += 1
+
+        def done(fut: asyncio.Future) -> None:
+            self.inflight.pop(app_id, None)
+            if fut.cancelled():
+                return
+            if fut.exception() is not None:
+                self.counters["fetch_errors"] += 1
+            else:
+                self._store(app_id, fut.result())
+
+        future.add_done_callback(done)
+        return future
+
+    async def get(self, app_id: int, refresh: bool = False) -> str:
+        self.counters["requests"] += 1
+        entry = self.cache.get(app_id)
+        if entry is not None and not refresh:
+            self.cache.move_to_end(app_id)
+            lua, fetched_at = entry
+            if self.clock() - fetched_at < self.ttl:
+                self.counters["hits"] += 1
+            else:
+                # Serve stale, refresh in the background
+                self.counters["stale_hits"] += 1
+                self._fetch(app_id)
+            return lua
+
+        self.counters["misses"] += 1
+        # shield: a client disconnect must not cancel a fetch others share
+        return await asyncio.shield(self._fetch(app_id))
+
+    # ── metrics ────────────────────────────────────────────────────────
+
+    def record_latency(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def metrics(self) -> Dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+        return {
+            **self.counters,
+            "cached": len(self.cache),
+            "inflight": len(self.inflight),
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                           "samples": len(ordered)},
+        }
+
+    def health(self) -> Dict:
+        return {"status": "ok", "uptime_s": round(self.clock() - self.started, 1),
+                "cached": len(self.cache), "inflight": len(self.inflight)}
+
+    # ── HTTP ───────────────────────────────────────────────────────────
+
+    async def route(self, path: str) -> Tuple[int, str, str]:
+        """Return (status, content type, body) for a GET path"""
+        url = urlsplit(path)
+        if url.path == "/health":
+            return 200, "application/json", json.dumps(self.health())
+        if url.path == "/metrics":
+            return 200, "application/json", json.dumps(self.metrics())
+        if url.path.startswith("/manifest/"):
+            app_id = url.path[len("/manifest/"):].removesuffix(".lua")
+            if not app_id.isdigit():
+                return 400, "application/json", json.dumps({"error": "invalid AppID"})
+            refresh = parse_qs(url.query).get("refresh", ["0"])[0] == "1"
+            try:
+                lua = await self.get(int(app_id), refresh)
+            except Exception as e:
+                return 502, "application/json", json.dumps({"error": str(e)})
+            return 200, "text/plain; charset=utf-8", lua
+        return 404, "application/json", json.dumps({"error": "not found"})
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, ctype, body = 400, "application/json", '{"error": "bad request"}'
+                elif parts[0] != "GET":
+                    status, ctype, body = 405, "application/json", '{"error": "method not allowed"}'
+                else:
+                    status, ctype, body = await self.route(parts[1])
+
+                keep_alive = (len(parts) == 3 and parts[2] == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                payload = body.encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: {ctype}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + payload
+                )
+                await writer.drain()
+                self.record_latency(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🚀 Manifest service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    service = ManifestService(
+        fetch=render_offline if "--offline" in args else render_manifest,
+        ttl=float(option("--ttl", 3600)),
+        max_entries=int(option("--cache", 1024)),
+    )
+    try:
+        asyncio.run(service.serve(option("--host", "127.0.0.1"), int(option("--port", 8765))))
+    except KeyboardInterrupt:
+        print("\n⏹  Stopped")
+
+
+if __name__ == "__main__":
+    main()
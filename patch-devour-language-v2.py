@@ -12,6 +12,7 @@ from pathlib import Path
 
 GAME_PATH = r"D:\SteamLibrary\steamapps\common\Devour"
 ASSETS_PATH = os.path.join(GAME_PATH, "DEVOUR_Data")
+BACKUP_DIR = os.path.join(GAME_PATH, ".vi_backups")
 
 # Vietnamese translations for common UI strings
 VI_TRANSLATIONS = {
@@ -93,11 +94,17 @@ def extract_strings_from_asset(asset_path):
         print(f"❌ Error reading {asset_path}: {e}")
         return []
 
-def patch_asset_file(asset_path, translations):
-    """Patch asset file with Vietnamese translations"""
+def patch_asset_file(asset_path, translations, delta_out=None, backup_dir=BACKUP_DIR):
+    """Patch asset file with Vietnamese translations
+
+    With delta_out, the asset is left untouched and a compact .dvdelta
+    (see asset_delta.py) is written there instead. Originals go to the
+    backup store in backup_dir.
+    """
     try:
         with open(asset_path, 'rb') as f:
-            content = bytearray(f.read())
+            original = f.read()
+        content = bytearray(original)
         
         patches_made = 0
         
@@ -122,10 +129,22 @@ def patch_asset_file(asset_path, translations):
                 
                 pos += len(en_bytes)
         
+        if patches_made > 0 and delta_out:
+            from asset_delta import make_delta
+            delta = make_delta(original, bytes(content))
+            with open(delta_out, 'wb') as f:
+                f.write(delta)
+            print(f"✅ {asset_path}: {patches_made} patches → {delta_out} ({len(delta)} bytes)")
+            return patches_made
+        
         # Write back
         if patches_made > 0:
+            from backup_store import get_store
+            store = get_store(backup_dir)
+            store.backup(asset_path, label="patch-devour-language-v2")
             with open(asset_path, 'wb') as f:
                 f.write(content)
+            store.mark_patched(asset_path)
             print(f"✅ {asset_path}: {patches_made} patches")
             return patches_made
         
@@ -144,15 +163,21 @@ def main():
         print(f"❌ Assets directory not found: {ASSETS_PATH}")
         return False
     
-    # Create backup first
+    # Originals are backed up per file in patch_asset_file()
     assets = list(Path(ASSETS_PATH).glob("**/*.assets"))
     print(f"🔍 Found {len(assets)} .assets files\n")
     
     total_patches = 0
     
+    # --delta <dir>: write .dvdelta files for distribution instead of patching
+    delta_dir = sys.argv[sys.argv.index("--delta") + 1] if "--delta" in sys.argv else None
+    if delta_dir:
+        os.makedirs(delta_dir, exist_ok=True)
+    
     for asset_file in assets:
         print(f"📝 Processing: {asset_file.name}")
-        patches = patch_asset_file(str(asset_file), VI_TRANSLATIONS)
+        delta_out = os.path.join(delta_dir, asset_file.name + ".dvdelta") if delta_dir else None
+        patches = patch_asset_file(str(asset_file), VI_TRANSLATIONS, delta_out)
         total_patches += patches
     
     print(f"\n✅ Total patches applied: {total_patches}")
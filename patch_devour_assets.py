@@ -9,14 +9,14 @@ Usage:
 
 import json
 import os
-import shutil
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # Game paths
 GAME_ROOT = Path("D:/SteamLibrary/steamapps/common/Devour")
 DEVOUR_DATA = GAME_ROOT / "DEVOUR_Data"
 STREAMING_ASSETS = DEVOUR_DATA / "StreamingAssets"
+BACKUP_DIR = GAME_ROOT / ".vi_backups"  # restore: python backup_store.py restore --store <dir>
 
 # Vietnamese translation dictionary
 TRANSLATIONS: Dict[str, str] = {
@@ -115,24 +115,46 @@ TRANSLATIONS: Dict[str, str] = {
     "Protect": "Bảo Vệ",
 }
 
+TEXT_EXTENSIONS = (".json", ".txt")
+TEXT_FOLDERS = ("StreamingAssets", "Resources")  # under DEVOUR_Data; the rest is Unity's own
+TEXT_MAX_SIZE = 16 * 1024 * 1024  # larger files are data, not text tables
+
+def scan_tree(root: Path, extensions: Tuple[str, ...], max_size: Optional[int] = None) -> Dict[str, Tuple[int, int]]:
+    """Single-pass os.scandir walk: {path: (mtime_ns, size)} for matching files"""
+    found = {}
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(extensions):
+                        st = entry.stat()
+                        if max_size is None or st.st_size <= max_size:
+                            found[entry.path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            continue
+    return found
+
 def find_text_files() -> List[Path]:
     """Find JSON and text files in game assets"""
     text_files = []
     
-    # Check StreamingAssets
-    if STREAMING_ASSETS.exists():
-        text_files.extend(STREAMING_ASSETS.glob("**/*.json"))
-        text_files.extend(STREAMING_ASSETS.glob("**/*.txt"))
-    
-    # Check Resources
-    resources = DEVOUR_DATA / "Resources"
-    if resources.exists():
-        text_files.extend(resources.glob("**/*.json"))
-        text_files.extend(resources.glob("**/*.txt"))
+    # StreamingAssets and Resources, one walk each
+    for folder in (DEVOUR_DATA / name for name in TEXT_FOLDERS):
+        if folder.exists():
+            text_files.extend(Path(p) for p in scan_tree(folder, TEXT_EXTENSIONS, TEXT_MAX_SIZE))
     
     return text_files
 
-def patch_json_file(file_path: Path) -> bool:
+def get_backup_store(backup_dir: Path = BACKUP_DIR):
+    """Shared BackupStore for the game folder, created on first use"""
+    from backup_store import get_store
+    return get_store(backup_dir)
+
+def patch_json_file(file_path: Path, backup_dir: Path = BACKUP_DIR) -> bool:
     """Patch JSON file with Vietnamese translations"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -147,13 +169,13 @@ def patch_json_file(file_path: Path) -> bool:
         
         # Only write if changed
         if content != original:
-            # Backup original
-            backup = file_path.with_suffix(file_path.suffix + ".en_backup")
-            if not backup.exists():
-                shutil.copy2(file_path, backup)
+            # Backup original (deduplicated, skipped if already stored)
+            store = get_backup_store(backup_dir)
+            store.backup(file_path, label="patch_devour_assets")
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            store.mark_patched(file_path)
             
             print(f"✓ Patched: {file_path.name}")
             return True
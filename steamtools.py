@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Steam Tools - single entry point for the Python scripts
+Heavy modules (requests, the generator, the asset patchers) are only
+imported by the subcommand that needs them, so per-app invocations from
+the Node bot pay for nothing else.
+
+Usage:
+    python steamtools.py manifest <AppID> [GameName]
+    python steamtools.py patch [--v2 [--delta <dir>]]
+    python steamtools.py extract <file.assets> [MinLength]
+    python steamtools.py search <root_path> <pattern>
+    python steamtools.py index stats|app|depot|stale|rebuild ...
+    python steamtools.py schedule [--games games.json] [--workers 4] [--once]
+    python steamtools.py serve [--port 8765] [--offline]
+    python steamtools.py history since <hours|ISO date>|depot <DepotID>|stats
+    python steamtools.py bundle pack|get <AppID>|list|info
+    python steamtools.py queue init|worker|spawn <N>|status|requeue [--db queue.db]
+    python steamtools.py watch [--root <DEVOUR_Data>] [--initial] [--poll]
+    python steamtools.py backup backup|restore|stats|gc [files...] [--store DIR]
+    python steamtools.py delta make|apply|revert|info ...
+    python steamtools.py tm suggest "<text>"|prefill <review.csv> [out.csv]|stats
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(relpath: str):
+    """Import a repo script by path (works for hyphenated file names).
+
+    Modules are cached in sys.modules, so repeated calls are free.
+    """
+    name = "_steamtools_" + relpath[:-3].replace("/", "_").replace("-", "_")
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relpath))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_generator():
+    """Return the SteamManifestGenerator class from comprehensive-manifest.py"""
+    return load_script("comprehensive-manifest.py").SteamManifestGenerator
+
+
+def cmd_manifest(args):
+    if not args:
+        print("Usage: python steamtools.py manifest <AppID> [GameName]")
+        return 1
+    generator = load_generator()(int(args[0]), args[1] if len(args) > 1 else "")
+    generator.run_all_methods()
+    return 0
+
+
+def cmd_patch(args):
+    if "--v2" in args:
+        return 0 if load_script("patch-devour-language-v2.py").main() else 1
+    load_script("patch_devour_assets.py").main()
+    return 0
+
+
+def cmd_extract(args):
+    if not args:
+        print("Usage: python steamtools.py extract <file.assets> [MinLength]")
+        return 1
+    min_length = int(args[1]) if len(args) > 1 else 5
+    strings = load_script("patch-devour-language-v2.py").extract_strings_from_asset(args[0])
+    for text in strings:
+        if len(text) >= min_length:
+            print(text)
+    return 0
+
+
+def cmd_search(args):
+    load_script("tools/find_string_in_files.py").main(args)
+    return 0
+
+
+def cmd_index(args):
+    load_script("manifest_index.py").main(args)
+    return 0
+
+
+def cmd_schedule(args):
+    load_script("manifest_scheduler.py").main(args)
+    return 0
+
+
+def cmd_serve(args):
+    load_script("manifest_service.py").main(args)
+    return 0
+
+
+def cmd_history(args):
+    load_script("manifest_history.py").main(args)
+    return 0
+
+
+def cmd_bundle(args):
+    load_script("manifest_bundle.py").main(args)
+    return 0
+
+
+def cmd_tm(args):
+    load_script("translation_memory.py").main(args)
+    return 0
+
+
+def cmd_queue(args):
+    load_script("manifest_queue.py").main(args)
+    return 0
+
+
+def cmd_watch(args):
+    load_script("asset_watch.py").main(args)
+    return 0
+
+
+def cmd_backup(args):
+    load_script("backup_store.py").main(args)
+    return 0
+
+
+def cmd_delta(args):
+    load_script("asset_delta.py").main(args)
+    return 0
+
+
+COMMANDS = {
+    "manifest": cmd_manifest,
+    "patch": cmd_patch,
+    "extract": cmd_extract,
+    "search": cmd_search,
+    "index": cmd_index,
+    "schedule": cmd_schedule,
+    "serve": cmd_serve,
+    "history": cmd_history,
+    "bundle": cmd_bundle,
+    "tm": cmd_tm,
+    "queue": cmd_queue,
+    "watch": cmd_watch,
+    "backup": cmd_backup,
+    "delta": cmd_delta,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print("Usage:" + __doc__.split("Usage:")[1].rstrip())
+        return 1
+    return COMMANDS[argv[0]](argv[1:]) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+test-asset-delta.py - make/apply/revert round trips of asset_delta.py and
+its checks against a wrong base file, in a temp directory
+
+Usage:
+    python test-asset-delta.py
+
+Expected output:
+    ✅ in place: applied, re-run is a no-op, reverted
+    ...
+    ✅ All asset delta checks passed!
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from asset_delta import DeltaError, apply_delta, make_delta
+
+rng = random.Random(5)
+ORIGINAL = bytes(rng.randrange(256) for _ in range(300_000))
+
+
+def patched(*edits) -> bytes:
+    data = bytearray(ORIGINAL)
+    for offset, old_len, new in sorted(edits, reverse=True):
+        data[offset:offset + old_len] = new
+    return bytes(data)
+
+
+SAME_SIZE = patched((1000, 4, b"ABCD"), (150_000, 4, b"QRST"))
+GROWN = patched((2000, 10, b"a longer translated string"))
+
+
+def round_trip(path: Path, target: bytes) -> None:
+    delta = make_delta(ORIGINAL, target)
+    path.write_bytes(ORIGINAL)
+    assert apply_delta(delta, str(path), full_verify=True) > 0
+    assert path.read_bytes() == target
+    assert apply_delta(delta, str(path), full_verify=True) == 0
+    apply_delta(delta, str(path), full_verify=True, reverse=True)
+    assert path.read_bytes() == ORIGINAL
+
+
+def rejects_wrong_base(path: Path, target: bytes, full_verify: bool) -> None:
+    delta = make_delta(ORIGINAL, target)
+    wrong = bytearray(ORIGINAL)
+    wrong[5] ^= 1       # same size, differs outside every record
+    path.write_bytes(wrong)
+    try:
+        apply_delta(delta, str(path), full_verify=full_verify)
+    except DeltaError:
+        assert path.read_bytes() == wrong, "wrong base modified"
+        assert not list(path.parent.glob("*.dvdelta_tmp"))
+        return
+    raise AssertionError("wrong base accepted")
+
+
+def check_in_place(tmp: Path):
+    round_trip(tmp / "same.bin", SAME_SIZE)
+    return "applied, re-run is a no-op, reverted"
+
+
+def check_length_change(tmp: Path):
+    round_trip(tmp / "grow.bin", GROWN)
+    delta = make_delta(ORIGINAL, GROWN)
+    return f"{len(GROWN) - len(ORIGINAL)}-byte growth in a {len(delta)}-byte delta, round trip OK"
+
+
+def check_wrong_base(tmp: Path):
+    rejects_wrong_base(tmp / "wrong_same.bin", SAME_SIZE, full_verify=True)
+    rejects_wrong_base(tmp / "wrong_grow.bin", GROWN, full_verify=False)
+    return "full verify (in place) and the rewrite hash (length change) leave it untouched"
+
+
+def check_interrupted(tmp: Path):
+    path = tmp / "half.bin"
+    path.write_bytes(patched((1000, 4, b"ABCD")))      # first of two records written
+    apply_delta(make_delta(ORIGINAL, SAME_SIZE), str(path), full_verify=True)
+    assert path.read_bytes() == SAME_SIZE
+    return "half-applied file completed under full verify"
+
+
+CHECKS = [
+    ("in place", check_in_place),
+    ("length change", check_length_change),
+    ("wrong base", check_wrong_base),
+    ("interrupted", check_interrupted),
+]
+
+
+def main():
+    print("🧪 Checking asset deltas...\n")
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, check in CHECKS:
+            try:
+                print(f"✅ {label}: {check(Path(tmp))}")
+            except (AssertionError, DeltaError) as e:
+                print(f"❌ {label}: {e}")
+                failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} asset delta check(s) failed")
+        sys.exit(1)
+    print("\n✅ All asset delta checks passed!")
+
+
+if __name__ == "__main__":
+    main()
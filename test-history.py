@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+test-history.py - Row/pointer consistency of manifest_history.HistoryStore
+(bad gids, reopen from latest.idx, concurrent appending processes) in a
+temp directory
+
+Usage:
+    python test-history.py
+
+Expected output:
+    ✅ bad gid: skipped without leaving a dangling latest pointer
+    ...
+    ✅ All history checks passed!
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from manifest_history import HistoryStore
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+APPENDER = """
+import sys
+from manifest_history import HistoryStore
+store = HistoryStore(sys.argv[1])
+worker = int(sys.argv[2])
+for i in range(150):
+    store.record(worker, {1000 + worker * 10 + i % 5: 100000 + i}, change=i)
+store.close()
+"""
+
+
+def check_bad_gid(tmp: Path):
+    store = HistoryStore(tmp / "bad")
+    assert store.record(1, {11: "111", 12: "bad", 13: str(1 << 64)}) == 1
+    assert store.record(2, {20: "200"}) == 1
+    assert [r["gid"] for r in store.history(11)] == [111]
+    assert [r["gid"] for r in store.history(20)] == [200]
+    assert store.latest_for(12) is None and store.latest_for(13) is None
+    store.close()
+
+    reopened = HistoryStore(tmp / "bad")
+    assert [r["depot"] for r in reopened.history(11)] == [11]
+    assert reopened.stats()["rows"] == 2
+    reopened.close()
+    return "skipped without leaving a dangling latest pointer"
+
+
+def check_unchanged_gid(tmp: Path):
+    store = HistoryStore(tmp / "same")
+    assert store.record(1, {11: 5}, timestamp=100.0) == 1
+    assert store.record(1, {11: "5"}, timestamp=200.0) == 0
+    assert store.record(1, {11: 6}, timestamp=300.0) == 1
+    assert [r["gid"] for r in store.history(11)] == [6, 5]
+    assert [r["depot"] for r in store.changed_since(150.0)] == [11]
+    store.close()
+    return "repeated gid appends nothing, changes link back to the previous row"
+
+
+def check_concurrent(tmp: Path):
+    root = tmp / "concurrent"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    procs = [subprocess.Popen([sys.executable, "-c", APPENDER, str(root), str(w)], env=env)
+             for w in range(4)]
+    assert all(p.wait(timeout=120) == 0 for p in procs)
+
+    store = HistoryStore(root)
+    rows = store.stats()["rows"]
+    assert rows == 4 * 150, rows
+    ts = store._column("ts")
+    assert all(ts[i] <= ts[i + 1] for i in range(rows - 1)), "ts not sorted"
+    for depot in store.latest:
+        chain = store.history(depot)
+        assert all(r["depot"] == depot for r in chain), depot
+        assert len(chain) == 30, (depot, len(chain))
+    store.close()
+    return f"4 processes appended {rows} rows; ts sorted, every depot chain intact"
+
+
+CHECKS = [
+    ("bad gid", check_bad_gid),
+    ("unchanged gid", check_unchanged_gid),
+    ("concurrent", check_concurrent),
+]
+
+
+def main():
+    print("🧪 Checking manifest history...\n")
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, check in CHECKS:
+            try:
+                print(f"✅ {label}: {check(Path(tmp))}")
+            except AssertionError as e:
+                print(f"❌ {label}: {e}")
+                failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} history check(s) failed")
+        sys.exit(1)
+    print("\n✅ All history checks passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+test-manifest-index.py - Depot/DLC split of manifest_index.parse_lua on the
+lua_game/ fixtures and on comprehensive-manifest.py's own output, plus an
+incremental refresh of ManifestIndex in a temp directory
+
+Usage:
+    python test-manifest-index.py
+
+Expected output:
+    ✅ DLC depots section: 200210 has 2 depots and 6 DLCs
+    ...
+    ✅ All manifest index checks passed!
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from manifest_index import ManifestIndex, parse_lua
+from steamtools import load_generator
+
+ROOT = Path(__file__).resolve().parent
+
+
+def parse_fixture(name: str) -> dict:
+    with open(ROOT / "lua_game" / name, encoding="utf-8-sig") as f:
+        return parse_lua(f.read())
+
+
+def check_dlc_depots_section():
+    parsed = parse_fixture("200210_RealmMadGod.lua")
+    assert parsed["appid"] == 200210
+    assert sorted(parsed["depots"]) == ["200211", "200212"], parsed["depots"]
+    assert sorted(parsed["dlcs"]) == [294180, 548380, 3306740, 3306750, 3306760, 3306770], parsed["dlcs"]
+    assert parsed["split"] == "sections"
+    return "200210 has 2 depots and 6 DLCs"
+
+
+def check_dlc_and_bonus_content():
+    parsed = parse_fixture("2947440_SilentHillf.lua")
+    assert list(parsed["depots"]) == ["2947441"], parsed["depots"]
+    assert 3282721 in parsed["dlcs"] and 3516200 in parsed["dlcs"], parsed["dlcs"]
+    assert all(int(app) in parsed["dlcs"] for app in parsed["tokens"]), parsed
+    return f"{len(parsed['dlcs'])} DLCs, {len(parsed['tokens'])} tokens, hashed DLC entry kept as DLC"
+
+
+def check_repeated_depot_versions():
+    parsed = parse_fixture("2124490_SilentHill2.lua")
+    assert sorted(parsed["depots"]) == ["2124491", "2124492"] and parsed["dlcs"] == [], parsed
+    return "multiple manifest versions of one depot stay one depot"
+
+
+def check_generator_output():
+    generator = load_generator()(200210, "Realm of the Mad God Exalt")
+    generator.depots = {200211: "", 200212: "5034766426048447237"}
+    generator.hashes = {200212: "ab" * 32}
+    generator.dlcs = {294180: None, 548380: None}
+    generator.tokens = {548380: "1234567890"}
+    parsed = parse_lua(generator.generate_lua())
+    assert parsed["depots"] == {"200211": "", "200212": "ab" * 32}, parsed["depots"]
+    assert sorted(parsed["dlcs"]) == [294180, 548380], parsed["dlcs"]
+    assert parsed["tokens"] == {"548380": "1234567890"} and parsed["split"] == "sections"
+    return "hashless override depot 200211 stays a depot"
+
+
+def check_without_sections():
+    parsed = parse_fixture("3687470_SushiHouse.lua")
+    assert list(parsed["depots"]) == ["3687471"] and parsed["split"] == "guessed", parsed
+    token_only = parse_lua('addappid(10)\naddappid(11, 1, "aa")\naddtoken(11, "5")\n')
+    assert token_only["dlcs"] == [11] and token_only["depots"] == {}, token_only
+    return "split marked as guessed; addtoken() still makes a DLC"
+
+
+def check_index_refresh():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        shutil.copytree(ROOT / "lua_game", root / "lua_game")
+        index = ManifestIndex(root).load()
+        app = index.app(200210)
+        assert len(app["dlcs"]) == 6 and app["split"] == "sections", app
+        assert index.owners(548380) == [200210]
+
+        path = root / "lua_game" / "3687470_SushiHouse.lua"
+        path.write_text("-- MAIN GAME\naddappid(3687470)\n-- BASE GAME DEPOTS\naddappid(3687471)\n",
+                        encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert index.refresh() == 1
+        assert index.app(3687470)["depots"] == {3687471: ""}, index.app(3687470)
+        assert index.app(3687470)["split"] == "sections"
+    return "edited file re-parsed, unchanged ones reused"
+
+
+CHECKS = [
+    ("DLC depots section", check_dlc_depots_section),
+    ("DLC & bonus content", check_dlc_and_bonus_content),
+    ("depot versions", check_repeated_depot_versions),
+    ("generator output", check_generator_output),
+    ("no sections", check_without_sections),
+    ("index refresh", check_index_refresh),
+]
+
+
+def main():
+    print("🧪 Checking manifest index...\n")
+    failures = 0
+    for label, check in CHECKS:
+        try:
+            print(f"✅ {label}: {check()}")
+        except AssertionError as e:
+            print(f"❌ {label}: {e}")
+            failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} manifest index check(s) failed")
+        sys.exit(1)
+    print("\n✅ All manifest index checks passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+test-queue.py - Lease reclaim, batch heartbeats and idempotent results of
+manifest_queue.py, with a fake clock and with real `spawn` workers
+(offline, in a temp directory)
+
+Usage:
+    python test-queue.py
+
+Expected output:
+    ✅ lease reclaim: expired lease handed to the next worker
+    ...
+    ✅ All queue checks passed!
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from manifest_queue import MAX_ATTEMPTS, WorkQueue, run_worker, write_result
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def check_lease_reclaim(tmp: Path):
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp / "reclaim.db"), clock=clock)
+    queue.enqueue([(10, "a")])
+    assert queue.claim("w1", lease=60) == [(10, "a")]
+    assert queue.claim("w2", lease=60) == []
+    clock.now += 61
+    assert queue.claim("w2", lease=60) == [(10, "a")]
+    assert not queue.complete("w1", 10, "stale")    # w1 lost its lease
+    assert queue.complete("w2", 10, "digest")
+    return "expired lease handed to the next worker, old owner rejected"
+
+
+def check_crash_loop(tmp: Path):
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp / "crash.db"), clock=clock)
+    queue.enqueue([(20, "crashes its worker")])
+    for attempt in range(MAX_ATTEMPTS):
+        assert queue.claim(f"w{attempt}", lease=60) == [(20, "crashes its worker")]
+        clock.now += 61     # worker died without calling fail()
+    assert queue.claim("next", lease=60) == []
+    states = queue.progress()["states"]
+    assert states == {"failed": 1}, states
+    return f"failed after {MAX_ATTEMPTS} expired leases"
+
+
+def check_batch_heartbeat(tmp: Path):
+    db = str(tmp / "batch.db")
+    queue = WorkQueue(db)
+    queue.enqueue([(30, ""), (31, ""), (32, "")])
+    lease = 0.3
+
+    def slow_job(app_id, name):
+        time.sleep(0.2)     # the whole batch takes twice the lease
+        return f"-- {app_id}\n"
+
+    worker = threading.Thread(target=run_worker, daemon=True, kwargs=dict(
+        queue=queue, worker="batcher", job=slow_job, lease=lease, batch=3,
+        output_dir=tmp / "batch_out", idle_sleep=0.05))
+    worker.start()
+    other = WorkQueue(db)
+    while "batcher" not in other.progress()["active"]:
+        time.sleep(0.005)
+    stolen = []
+    while worker.is_alive():
+        stolen += other.claim("thief", count=3, lease=lease)
+        time.sleep(0.02)
+    assert not stolen, stolen
+    done_by = queue.progress()["done_by"]
+    assert done_by == {"batcher": 3}, done_by
+    return "no job of a 3-job batch was handed out twice"
+
+
+def check_idempotent_results(tmp: Path):
+    out = tmp / "results"
+    first = write_result(40, "addappid(40)\n", out)
+    again = write_result(40, "addappid(40)\n", out)
+    assert first[1] and not again[1] and first[0] == again[0]
+    assert not list(out.glob("*.tmp"))
+    return "same content is not rewritten"
+
+
+def check_spawn(tmp: Path):
+    work = tmp / "spawn"
+    work.mkdir()
+    apps = [{"appId": 480 + i, "name": f"App {i}"} for i in range(4)]
+    (work / "games.json").write_text(json.dumps(apps), encoding="utf-8")
+    script = os.path.join(ROOT, "manifest_queue.py")
+
+    def run(*args):
+        result = subprocess.run([sys.executable, script, *args, "--db", "q.db"],
+                                cwd=work, capture_output=True, text=True, timeout=300)
+        assert result.returncode == 0, result.stderr[-500:]
+        return result.stdout
+
+    run("init", "--games", "games.json")
+    run("spawn", "2", "--offline", "--batch", "2")
+    files = {p.name: p.read_bytes() for p in (work / "manifests").glob("*.lua")}
+    assert len(files) == 4, sorted(files)
+    queue = WorkQueue(str(work / "q.db"))
+    assert queue.progress()["states"] == {"done": 4}, queue.progress()
+
+    # A second full run produces identical files and rewrites none of them
+    run("requeue")
+    output = run("spawn", "2", "--offline")
+    assert "written" not in output and output.count("unchanged") == 4, output[-500:]
+    assert files == {p.name: p.read_bytes() for p in (work / "manifests").glob("*.lua")}
+    workers = sorted(queue.progress()["done_by"])
+    return f"4 apps done by {', '.join(workers)}; rerun left every file unchanged"
+
+
+CHECKS = [
+    ("lease reclaim", check_lease_reclaim),
+    ("crash loop", check_crash_loop),
+    ("batch heartbeat", check_batch_heartbeat),
+    ("idempotent results", check_idempotent_results),
+    ("spawn", check_spawn),
+]
+
+
+def main():
+    print("🧪 Checking shared work queue...\n")
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, check in CHECKS:
+            try:
+                print(f"✅ {label}: {check(Path(tmp))}")
+            except AssertionError as e:
+                print(f"❌ {label}: {e}")
+                failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} queue check(s) failed")
+        sys.exit(1)
+    print("\n✅ All queue checks passed!")
+
+
+if __name__ == "__main__":
+    main()
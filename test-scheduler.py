@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+test-scheduler.py - Drives manifest_scheduler.Scheduler with fake sources
+and a fake clock (InlineExecutor, no threads, no network)
+
+Usage:
+    python test-scheduler.py
+
+Expected output:
+    ✅ rate limits: steamcmd calls spaced by its refill interval
+    ...
+    ✅ All scheduler checks passed!
+"""
+
+import sys
+
+from manifest_scheduler import InlineExecutor, Scheduler
+
+RATES = {"steamcmd": (1 / 10, 2), "steamdb": (1 / 5, 3)}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(seconds, 0.001)
+
+
+def make_scheduler(clock, runner, **kwargs):
+    return Scheduler(runner=runner, rates=RATES, clock=clock, sleep=clock.sleep,
+                     executor=InlineExecutor(), max_workers=4, **kwargs)
+
+
+def fake_source(clock, calls, latency=1.0, fail=()):
+    """Runner hitting steamcmd then steamdb; each source call takes `latency`"""
+    def runner(app_id, name, acquire):
+        for source in ("steamcmd", "steamdb"):
+            acquire(source)
+            calls.append((app_id, source, clock.now))
+            clock.now += latency
+        if app_id in fail:
+            raise RuntimeError("source down")
+        return {"depots": 1}
+    return runner
+
+
+def check_rate_limits():
+    clock, calls = FakeClock(), []
+    scheduler = make_scheduler(clock, fake_source(clock, calls))
+    for app_id in range(1, 7):
+        scheduler.add(app_id)
+    scheduler.run(once=True)
+
+    steamcmd = [t for _, source, t in calls if source == "steamcmd"]
+    assert len(steamcmd) == 6, steamcmd
+    # Burst of 2, then one token per 10s: call k (k >= 2) is at least 10*(k-1) s in
+    for k, t in enumerate(steamcmd[2:], start=2):
+        assert t - steamcmd[0] >= 10 * (k - 1) - 1e-6, (k, t - steamcmd[0])
+    return "steamcmd calls spaced by its refill interval"
+
+
+def check_latency_excludes_rate_limit_wait():
+    clock, calls = FakeClock(), []
+    scheduler = make_scheduler(clock, fake_source(clock, calls), target_latency=5.0)
+    for app_id in range(1, 13):
+        scheduler.add(app_id)
+    scheduler.run(once=True)
+    # Every job waits ~10s on steamcmd but its sources only take 2s
+    assert scheduler.stats["completed"] == 12
+    assert scheduler.concurrency.limit > 1, scheduler.concurrency.limit
+    return f"bucket waits do not shrink the pool (limit {scheduler.concurrency.limit})"
+
+
+def check_backoff():
+    clock, calls = FakeClock(), []
+    scheduler = make_scheduler(clock, fake_source(clock, calls, fail={7}), retry_delay=300)
+    scheduler.add(7)
+    starts = []
+    for _ in range(4):
+        wait = scheduler.next_due_in()
+        clock.sleep(wait)
+        starts.append(clock.now)
+        assert scheduler.tick() == 1
+    gaps = [round(b - a) for a, b in zip(starts, starts[1:])]
+    # Each gap is the backoff plus the 2s the failing job itself took
+    assert gaps == [302, 602, 1202], gaps
+    assert scheduler.apps[7]["failures"] == 4
+    return "failures retried after 300s, 600s, 1200s"
+
+
+def check_once_is_one_pass():
+    clock, calls = FakeClock(), []
+    scheduler = make_scheduler(clock, fake_source(clock, calls, latency=0.1, fail={3}),
+                               max_age=24 * 3600, retry_delay=1)
+    scheduler.add(1)
+    scheduler.add(2)
+    scheduler.add(3)
+    scheduler.add(4, last_refreshed=clock.now - 60)     # generated a minute ago
+    started = clock.now
+    scheduler.run(once=True)
+
+    ran = [app_id for app_id, source, _ in calls if source == "steamcmd"]
+    assert sorted(ran) == [1, 2, 3], ran
+    elapsed = clock.now - started
+    assert elapsed < 60, elapsed
+    return f"due apps ran once each, fresh app skipped ({elapsed:.0f}s simulated)"
+
+
+CHECKS = [
+    ("rate limits", check_rate_limits),
+    ("latency", check_latency_excludes_rate_limit_wait),
+    ("backoff", check_backoff),
+    ("--once", check_once_is_one_pass),
+]
+
+
+def main():
+    print("🧪 Checking refresh scheduler...\n")
+    failures = 0
+    for label, check in CHECKS:
+        try:
+            print(f"✅ {label}: {check()}")
+        except AssertionError as e:
+            print(f"❌ {label}: {e}")
+            failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} scheduler check(s) failed")
+        sys.exit(1)
+    print("\n✅ All scheduler checks passed!")
+
+
+if __name__ == "__main__":
+    main()
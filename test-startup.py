@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+test-startup.py - Import-time budget check for steamtools.py
+
+Runs each scenario under `python -X importtime`, subtracts the modules the
+bare interpreter already loads, and fails if the remaining import cost
+exceeds its budget or pulls in a module that should stay lazy.
+
+Usage:
+    python test-startup.py
+
+Expected output:
+    ✅ import steamtools: 2.4 ms (budget 25 ms)
+    ✅ load generator: 9.8 ms (budget 60 ms)
+    ✅ All startup checks passed!
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Never acceptable on the startup path of any subcommand
+HEAVY_MODULES = ("requests", "urllib3", "ssl", "http.client", "asyncio", "sqlite3", "unitypy")
+
+SCENARIOS = [
+    # (label, code, budget_ms)
+    ("import steamtools", "import steamtools", 25),
+    ("load generator", "import steamtools; steamtools.load_generator()", 60),
+    ("usage", "import steamtools; steamtools.main([])", 25),
+]
+
+
+def import_times(code):
+    """Return {module: self_us} for everything imported while running code"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if result.returncode not in (0, 1):
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def main():
+    print("🧪 Checking startup import budget...\n")
+    baseline = set(import_times("pass"))
+    failures = 0
+
+    for label, code, budget_ms in SCENARIOS:
+        times = import_times(code)
+        added = {name: us for name, us in times.items() if name not in baseline}
+        total_ms = sum(added.values()) / 1000
+        heavy = [name for name in added if name.split(".")[0] in HEAVY_MODULES or name in HEAVY_MODULES]
+
+        if heavy:
+            print(f"❌ {label}: imports {', '.join(sorted(heavy))}")
+            failures += 1
+        elif total_ms > budget_ms:
+            slowest = sorted(added.items(), key=lambda kv: -kv[1])[:5]
+            print(f"❌ {label}: {total_ms:.1f} ms (budget {budget_ms} ms)")
+            for name, us in slowest:
+                print(f"     {us / 1000:6.1f} ms  {name}")
+            failures += 1
+        else:
+            print(f"✅ {label}: {total_ms:.1f} ms (budget {budget_ms} ms)")
+
+    if failures:
+        print(f"\n❌ {failures} startup check(s) failed")
+        sys.exit(1)
+    print("\n✅ All startup checks passed!")
+
+
+if __name__ == "__main__":
+    main()
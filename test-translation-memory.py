@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+test-translation-memory.py - Fuzzy lookup correctness and latency of
+translation_memory.py on a 100k-entry memory grown from the repo's own
+pairs (mutated and concatenated, fixed seed)
+
+Usage:
+    python test-translation-memory.py [--entries N] [--queries N]
+
+Expected output:
+    ✅ exact: repo pair returned as a 100% match
+    ...
+    ✅ All translation memory checks passed!
+"""
+
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from translation_memory import TranslationMemory, main as tm_main, normalize, trigrams
+
+ROOT = Path(__file__).resolve().parent
+MEAN_BUDGET_MS = 15.0
+P95_BUDGET_MS = 30.0
+MIN_RECALL = 0.9
+
+
+def option(argv, flag, default):
+    return int(argv[argv.index(flag) + 1]) if flag in argv else default
+
+
+class Corpus:
+    """Game-like strings derived from the repo pairs"""
+
+    def __init__(self, sources, seed: int = 7):
+        self.random = random.Random(seed)
+        self.words = sorted({w for s in sources for w in re.findall(r"[A-Za-z']+", s)})
+        self.descriptions = [s for s in sources if len(s) > 25]
+
+    def mutate(self, text: str) -> str:
+        words = text.split()
+        for _ in range(self.random.randint(1, 3)):
+            i = self.random.randrange(len(words))
+            r = self.random.random()
+            if r < 0.4:
+                words[i] = self.random.choice(self.words)
+            elif r < 0.7:
+                words[i] = f"{self.random.randint(1, 100)}{self.random.choice(['%', 's', ''])}"
+            else:
+                words.insert(i, self.random.choice(self.words))
+        return " ".join(words)
+
+    def description(self) -> str:
+        return self.mutate(self.random.choice(self.descriptions))
+
+    def entry(self) -> str:
+        r = self.random.random()
+        if r < 0.5:
+            return self.description()
+        if r < 0.8:
+            return f"{self.description()}. {self.description()}"
+        return " ".join(self.random.choice(self.words)
+                        for _ in range(self.random.randint(2, 8)))
+
+
+def dice(a: str, b: str) -> float:
+    x, y = trigrams(normalize(a)), trigrams(normalize(b))
+    return 2 * len(x & y) / (len(x) + len(y)) if x or y else 1.0
+
+
+def check_exact(tm, corpus, queries):
+    source = "Moonless Night: Outfit for Cultist"
+    matches = tm.suggest(source)
+    assert matches and matches[0]["kind"] == "exact", matches[:1]
+    return "repo pair returned as a 100% match"
+
+
+def check_fuzzy(tm, corpus, queries):
+    matches = tm.fuzzy("Moonless Night: Outfit for Cultist 2")
+    found = [m for m in matches if m["source"] == "Moonless Night: Outfit for Cultist"]
+    assert found and found[0]["score"] >= 0.9, matches
+    return f"repo pair found among {len(matches)} matches ({found[0]['score']:.0%})"
+
+
+def check_prefill(tm, corpus, queries):
+    with tempfile.TemporaryDirectory() as tmp:
+        review = Path(tmp) / "review.csv"
+        original = ("\ufeffKey,English,Vietnamese,Status\n"
+                    "a,Protect your friends from the demon at all costs tonight,,\n"
+                    "b,Moonless Night: Outfit for Cultist 2,,\n").encode("utf-8")
+        review.write_bytes(original)
+        tm_main(["prefill", str(review)])
+        assert review.read_bytes() == original, "input rewritten"
+        output = review.with_suffix(".prefilled.csv").read_bytes()
+        assert output.startswith(b"\xef\xbb\xbf"), "BOM lost"
+        rows = output.decode("utf-8-sig").splitlines()
+        assert rows[1].endswith('"",""'), rows[1]      # one known word is no draft
+        assert "TM fuzzy" in rows[2], rows[2]
+    return "low-coverage draft left empty, input and its BOM untouched"
+
+
+def check_latency(tm, corpus, queries):
+    tm.fuzzy("warm up")     # builds the index
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        tm.suggest(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[int(len(latencies) * 0.95)]
+    assert mean <= MEAN_BUDGET_MS, f"mean {mean:.1f} ms > {MEAN_BUDGET_MS} ms"
+    assert p95 <= P95_BUDGET_MS, f"p95 {p95:.1f} ms > {P95_BUDGET_MS} ms"
+    return (f"{len(queries)} queries over {len(tm):,} entries: "
+            f"mean {mean:.1f} ms, p95 {p95:.1f} ms, max {latencies[-1]:.1f} ms")
+
+
+def check_recall(tm, corpus, queries):
+    hits = total = 0
+    while total < 200:
+        source = tm.sources[corpus.random.randrange(len(tm))]
+        query = corpus.mutate(source)
+        if dice(query, source) < 0.6:
+            continue
+        total += 1
+        hits += any(m["source"] == source for m in tm.fuzzy(query, 5))
+    assert hits >= MIN_RECALL * total, f"{hits}/{total}"
+    return f"mutated entries found their origin in the top 5: {hits}/{total}"
+
+
+CHECKS = [
+    ("exact", check_exact),
+    ("fuzzy", check_fuzzy),
+    ("prefill", check_prefill),
+    ("latency", check_latency),
+    ("recall", check_recall),
+]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    entries = option(argv, "--entries", 100_000)
+    count = option(argv, "--queries", 300)
+
+    print("🧪 Checking translation memory...\n")
+    tm = TranslationMemory.from_repo(ROOT)
+    corpus = Corpus(tm.sources)
+    start = time.perf_counter()
+    while len(tm) < entries:
+        tm.add(corpus.entry(), "vi", "bench")
+    queries = [corpus.description() if i % 3 == 0 else
+               f"{corpus.description()}. {corpus.description()}" if i % 3 == 1 else
+               corpus.mutate(tm.sources[corpus.random.randrange(len(tm))])
+               for i in range(count)]
+    print(f"📊 {len(tm):,} entries generated in {time.perf_counter() - start:.1f}s\n")
+
+    failures = 0
+    for label, check in CHECKS:
+        try:
+            print(f"✅ {label}: {check(tm, corpus, queries)}")
+        except AssertionError as e:
+            print(f"❌ {label}: {e}")
+            failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} translation memory check(s) failed")
+        sys.exit(1)
+    print("\n✅ All translation memory checks passed!")
+
+
+if __name__ == "__main__":
+    main()
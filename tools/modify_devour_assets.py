@@ -2,6 +2,10 @@
 """
 DEVOUR Vietnamese Asset Modifier using unitypy
 Extracts text from sharedassets0.assets and replaces with Vietnamese
+
+Usage:
+    python modify_devour_assets.py                      # patch in place
+    python modify_devour_assets.py --delta vi.dvdelta   # write a delta only
 """
 
 import sys
@@ -21,7 +25,8 @@ TRANSLATIONS = {
 
 GAME_PATH = Path("D:\\SteamLibrary\\steamapps\\common\\Devour\\DEVOUR_Data")
 ASSETS_FILE = GAME_PATH / "sharedassets0.assets"
-BACKUP_FILE = GAME_PATH / "sharedassets0.assets.backup"
+BACKUP_DIR = GAME_PATH.parent / ".vi_backups"
+DELTA_OUT = sys.argv[sys.argv.index("--delta") + 1] if "--delta" in sys.argv else None
 
 print("🎮 DEVOUR Vietnamese Asset Modifier")
 print("=" * 60)
@@ -42,12 +47,13 @@ except ImportError as e:
     print("Please run: pip install unitypy")
     sys.exit(1)
 
-# Step 1: Backup original
-if not BACKUP_FILE.exists():
-    print("💾 Creating backup...")
-    import shutil
-    shutil.copy2(ASSETS_FILE, BACKUP_FILE)
-    print(f"✅ Backup created: {BACKUP_FILE}\n")
+# Step 1: Backup original (chunked + deduplicated; no-op if already stored)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backup_store import get_store
+backup_store = get_store(BACKUP_DIR)
+print("💾 Checking backup...")
+backup_store.backup(ASSETS_FILE, label="modify_devour_assets")
+print(f"✅ Original stored in: {BACKUP_DIR}\n")
 
 # Step 2: Load assets
 print("🔍 Loading assets...")
@@ -85,10 +91,29 @@ for obj in env.objects.values():
 if modified_count > 0:
     print(f"\n✅ Found {modified_count} translations to apply\n")
     
+    # Step 4 (delta mode): save to a temp file, diff it, leave the game untouched
+    if DELTA_OUT:
+        from asset_delta import make_delta_files
+        temp_file = ASSETS_FILE.with_suffix(".assets.vi_tmp")
+        print("💾 Building delta patch...")
+        try:
+            env.save(str(temp_file))
+            info = make_delta_files(str(ASSETS_FILE), str(temp_file), DELTA_OUT)
+        except Exception as e:
+            print(f"❌ Error building delta: {e}")
+            sys.exit(1)
+        finally:
+            if temp_file.exists():
+                temp_file.unlink()
+        print(f"✅ Delta saved to: {DELTA_OUT} ({info['records']} records, {info['delta_size']} bytes)")
+        print(f"   Apply with: python asset_delta.py apply \"{DELTA_OUT}\" \"{ASSETS_FILE}\"")
+        sys.exit(0)
+    
     # Step 4: Save modified assets
     print("💾 Saving modified assets...")
     try:
         env.save(str(ASSETS_FILE))
+        backup_store.mark_patched(ASSETS_FILE)
         print(f"✅ Saved to: {ASSETS_FILE}\n")
         
         print("=" * 60)
@@ -98,8 +123,8 @@ if modified_count > 0:
         for en, vi in found_strings.items():
             print(f"  • {en} → {vi}")
         print("\n🎮 Restart DEVOUR to see Vietnamese items!")
-        print("📍 If you need to restore English, rename backup:")
-        print(f"   {BACKUP_FILE} → {ASSETS_FILE}")
+        print("📍 If you need to restore English, run:")
+        print(f"   python backup_store.py restore \"{ASSETS_FILE}\" --store \"{BACKUP_DIR}\"")
         
     except Exception as e:
         print(f"❌ Error saving assets: {e}")
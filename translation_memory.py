@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+EN -> VI Translation Memory
+Indexes every existing translation pair and suggests translations for new
+strings: exact matches, fuzzy matches ranked by similarity, and
+sub-segment matches (known phrases inside a longer string, e.g.
+"Moonless Night: Outfit for Cultist" -> "Đêm Không Trăng: ...").
+
+Sources:
+  * TRANSLATIONS / VI_TRANSLATIONS dicts in patch_devour_assets.py,
+    patch-devour-language-v2.py and tools/modify_devour_assets.py
+    (read with ast, nothing is executed)
+  * inventory.json aligned with inventory_vi*.json / inventory_DEVOUR_VI*.json
+  * translation_projects/*/inventory.json + inventory_vi.json
+  * reviewed rows of inventory_vi_sample.csv
+
+Fuzzy lookup uses a character-trigram inverted index. Entries are
+numbered by trigram count, so the sizes that can reach the threshold are
+one id range, cut out of each posting list by bisection (length filter).
+Lists are counted rarest first up to SCAN_BUDGET ids. When the rarest
+|Q| - needed + 1 lists fit (prefix filter) no match can be missed;
+otherwise the query is mostly very common trigrams, and only entries
+sharing the counted ones are considered. The frequent lists then only
+add to the counts of the leading candidates, and when some lists were
+never read the best candidates by partial Dice are verified exactly.
+Sub-segments come from a word n-gram table.
+
+Usage:
+    python translation_memory.py suggest "<English text>" [-n 5]
+    python translation_memory.py prefill <review.csv> [out.csv] [--min 0.75]
+    python translation_memory.py stats
+
+prefill never overwrites its input unless out.csv names it; by default it
+writes <review>.prefilled.csv next to it.
+"""
+
+import ast
+import csv
+import heapq
+import json
+import math
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DICT_SOURCES = (
+    ("patch_devour_assets.py", "TRANSLATIONS"),
+    ("patch-devour-language-v2.py", "VI_TRANSLATIONS"),
+    ("tools/modify_devour_assets.py", "TRANSLATIONS"),
+)
+INVENTORY_EN = "inventory.json"
+INVENTORY_VI = ("inventory_vi.json", "inventory_DEVOUR_VI.json",
+                "inventory_DEVOUR_VI_FINAL.json", "inventory_vi_sample.json")
+INVENTORY_FIELDS = ("name", "description", "display_type", "item_slot")
+REVIEW_CSV = "inventory_vi_sample.csv"
+MAX_PHRASE_WORDS = 6
+SCAN_BUDGET = 10000     # posting ids counted per fuzzy query ...
+CANDIDATE_LIMIT = 2048  # ... the best entries by partial Dice are kept ...
+REFINE_BUDGET = 60000   # ... and their counts completed up to this many ids
+VERIFY_LIMIT = 64       # candidates re-scored exactly when counts are partial
+
+WORD_PATTERN = re.compile(r"[\w']+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ── loading existing pairs ─────────────────────────────────────────────
+
+def load_dict_pairs(root: Path) -> Iterable[Tuple[str, str, str]]:
+    for filename, name in DICT_SOURCES:
+        path = root / filename
+        if not path.exists():
+            continue
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            targets = []
+            if isinstance(node, ast.Assign):
+                targets, value = node.targets, node.value
+            elif isinstance(node, ast.AnnAssign) and node.value is not None:
+                targets, value = [node.target], node.value
+            if any(isinstance(t, ast.Name) and t.id == name for t in targets):
+                for en, vi in ast.literal_eval(value).items():
+                    yield en, vi, filename
+
+
+def _inventory_pairs(en_file: Path, vi_file: Path) -> Iterable[Tuple[str, str, str]]:
+    with open(en_file, encoding="utf-8") as f:
+        english = json.load(f)
+    with open(vi_file, encoding="utf-8") as f:
+        vietnamese = json.load(f)
+    for key, vi_item in vietnamese.items():
+        en_item = english.get(key)
+        if not isinstance(en_item, dict) or not isinstance(vi_item, dict):
+            continue
+        for field in INVENTORY_FIELDS:
+            en, vi = en_item.get(field), vi_item.get(field)
+            if isinstance(en, str) and isinstance(vi, str) and en.strip() and vi.strip() and en != vi:
+                yield en, vi, vi_file.as_posix()
+
+
+def load_inventory_pairs(root: Path) -> Iterable[Tuple[str, str, str]]:
+    if (root / INVENTORY_EN).exists():
+        for name in INVENTORY_VI:
+            if (root / name).exists():
+                yield from _inventory_pairs(root / INVENTORY_EN, root / name)
+    projects = root / "translation_projects"
+    if projects.is_dir():
+        for project in sorted(projects.iterdir()):
+            en_file, vi_file = project / "inventory.json", project / "inventory_vi.json"
+            if en_file.exists() and vi_file.exists():
+                yield from _inventory_pairs(en_file, vi_file)
+
+
+def load_csv_pairs(path: Path) -> Iterable[Tuple[str, str, str]]:
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            en, vi = (row.get("English") or "").strip(), (row.get("Vietnamese") or "").strip()
+            if en and vi and en != vi:
+                yield en, vi, path.name
+
+
+# ── the index ──────────────────────────────────────────────────────────
+
+class TranslationMemory:
+    def __init__(self):
+        self.sources: List[str] = []
+        self.targets: List[str] = []
+        self.origins: List[str] = []
+        self.exact: Dict[str, int] = {}
+        # Built by _build_index() on first lookup after add()
+        self.keys: List[str] = []
+        self.sizes = array("I")     # trigram count per entry, ascending
+        self.postings: Dict[str, array] = {}
+        self.phrases: Dict[Tuple[str, ...], int] = {}
+        self.indexed = True
+
+    def add(self, source: str, target: str, origin: str = "") -> None:
+        key = normalize(source)
+        if not key or key in self.exact:
+            return      # first source wins; dict sources are loaded first
+        self.exact[key] = len(self.sources)
+        self.sources.append(source)
+        self.targets.append(target)
+        self.origins.append(origin)
+        self.indexed = False
+
+    def _build_index(self) -> None:
+        """Renumber entries by trigram count and rebuild postings/phrases"""
+        keys = [normalize(s) for s in self.sources]
+        order = sorted(range(len(keys)), key=lambda e: len(trigrams(keys[e])))
+        rank = array("I", bytes(4 * len(order)))
+        for entry, original in enumerate(order):
+            rank[original] = entry
+
+        self.sources = [self.sources[e] for e in order]
+        self.targets = [self.targets[e] for e in order]
+        self.origins = [self.origins[e] for e in order]
+        self.keys = [keys[e] for e in order]
+        self.exact = {key: entry for entry, key in enumerate(self.keys)}
+        self.sizes = array("I")
+        self.postings = {}
+        for entry, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("I")
+                posting.append(entry)
+        self.phrases = {}
+        for original, key in enumerate(keys):      # insertion order: first wins
+            words = tuple(WORD_PATTERN.findall(key))
+            if 0 < len(words) <= MAX_PHRASE_WORDS:
+                self.phrases.setdefault(words, rank[original])
+        self.indexed = True
+
+    def _ensure_index(self) -> None:
+        if not self.indexed:
+            self._build_index()
+
+    @classmethod
+    def from_repo(cls, root: Path = Path(".")) -> "TranslationMemory":
+        tm = cls()
+        for loader in (load_dict_pairs(root), load_inventory_pairs(root),
+                       load_csv_pairs(root / REVIEW_CSV)):
+            for source, target, origin in loader:
+                tm.add(source, target, origin)
+        tm._build_index()
+        return tm
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def _match(self, entry: int, score: float, kind: str) -> Dict:
+        return {"source": self.sources[entry], "target": self.targets[entry],
+                "score": round(score, 3), "kind": kind, "origin": self.origins[entry]}
+
+    def fuzzy(self, text: str, limit: int = 5, min_score: float = 0.6) -> List[Dict]:
+        """Ranked matches with trigram Dice similarity >= min_score"""
+        self._ensure_index()
+        key = normalize(text)
+        if not key:
+            return []
+        exact = self.exact.get(key)
+        results = [self._match(exact, 1.0, "exact")] if exact is not None else []
+
+        # Dice >= t needs t/(2-t)*|Q| <= |E| <= (2-t)/t*|Q| and an overlap of
+        # at least t*|Q|/(2-t) trigrams
+        query_grams = trigrams(key)
+        total = len(query_grams)
+        lo_id = bisect_left(self.sizes, math.ceil(min_score * total / (2 - min_score)))
+        hi_id = bisect_right(self.sizes, int((2 - min_score) * total / min_score))
+        needed = max(1, math.ceil(min_score * total / (2 - min_score)))
+
+        lists = []
+        for gram in query_grams:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                a, b = bisect_left(posting, lo_id), bisect_left(posting, hi_id)
+                if b > a:
+                    lists.append((b - a, gram, a, b))
+        if len(lists) < needed:
+            return results
+        lists.sort()
+
+        overlap: Counter = Counter()
+        scanned = volume = 0
+        for count, gram, a, b in lists:
+            if scanned and volume + count > SCAN_BUDGET:
+                break
+            overlap.update(self.postings[gram][a:b])
+            volume += count
+            scanned += 1
+        overlap.pop(exact, None)
+
+        # Candidates are ranked by their Dice over the lists read so far, so
+        # long entries sharing many common grams do not crowd out short ones
+        sizes = self.sizes
+
+        def partial(entry):
+            return overlap[entry] / (total + sizes[entry])
+
+        # Complete the counts of the leading candidates from the longer lists;
+        # set.intersection walks each slice in C
+        if scanned < len(lists) and len(overlap) > CANDIDATE_LIMIT:
+            overlap = Counter({entry: overlap[entry] for entry in
+                               heapq.nlargest(CANDIDATE_LIMIT, overlap, key=partial)})
+        candidates = set(overlap)
+        for count, gram, a, b in lists[scanned:]:
+            if volume + count > REFINE_BUDGET:
+                break
+            overlap.update(candidates.intersection(self.postings[gram][a:b]))
+            volume += count
+            scanned += 1
+
+        # Unscanned lists may still add to an entry's overlap: keep entries
+        # that could reach the threshold, then verify the best-ranked ones
+        unscanned = len(lists) - scanned
+        reachable = [(shared, entry) for entry, shared in overlap.items()
+                     if 2 * (shared + unscanned) >= min_score * (total + sizes[entry])]
+        if unscanned:
+            reachable = [(len(query_grams & trigrams(self.keys[entry])), entry)
+                         for entry in heapq.nlargest(VERIFY_LIMIT, (e for _, e in reachable),
+                                                     key=partial)]
+        scored = []
+        for shared, entry in reachable:
+            dice = 2 * shared / (total + sizes[entry])
+            if dice >= min_score:
+                scored.append((dice, entry))
+        scored = heapq.nlargest(limit * 2, scored)
+
+        # Re-rank the shortlist with an edit-based ratio
+        reranked = []
+        for dice, entry in scored:
+            ratio = SequenceMatcher(None, key, self.keys[entry]).ratio()
+            reranked.append(((dice + ratio) / 2, entry))
+        reranked.sort(reverse=True)
+        results.extend(self._match(entry, score, "fuzzy") for score, entry in reranked)
+        return results[:limit]
+
+    def segments(self, text: str) -> List[Dict]:
+        """Known phrases inside `text`, longest first, non-overlapping"""
+        self._ensure_index()
+        spans = [(m.start(), m.end(), m.group().lower()) for m in WORD_PATTERN.finditer(text)]
+        words = [w for _, _, w in spans]
+        found, used = [], [False] * len(words)
+        for n in range(min(MAX_PHRASE_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                if any(used[i:i + n]):
+                    continue
+                entry = self.phrases.get(tuple(words[i:i + n]))
+                if entry is None:
+                    continue
+                for j in range(i, i + n):
+                    used[j] = True
+                found.append({**self._match(entry, n / len(words), "segment"),
+                              "start": spans[i][0], "end": spans[i + n - 1][1]})
+        return sorted(found, key=lambda m: m["start"])
+
+    def pretranslate(self, text: str) -> Tuple[str, float]:
+        """Replace every known sub-segment in place; returns (text, coverage)"""
+        segments = self.segments(text)
+        if not segments:
+            return text, 0.0
+        out, pos, covered = [], 0, 0
+        for seg in segments:
+            out.append(text[pos:seg["start"]])
+            out.append(seg["target"])
+            covered += seg["end"] - seg["start"]
+            pos = seg["end"]
+        out.append(text[pos:])
+        letters = sum(1 for c in text if not c.isspace()) or 1
+        return "".join(out), min(1.0, covered / letters)
+
+    def suggest(self, text: str, limit: int = 5, min_score: float = 0.6) -> List[Dict]:
+        """Fuzzy matches plus a pre-translated draft; min_score applies to
+        the draft's coverage too, so one known word does not make a draft"""
+        results = self.fuzzy(text, limit, min_score)
+        if not results or results[0]["kind"] != "exact":
+            draft, coverage = self.pretranslate(text)
+            if coverage and coverage >= min_score:
+                results.append({"source": text, "target": draft, "score": round(coverage, 3),
+                                "kind": "segment", "origin": "pre-translation"})
+        return results
+
+
+def prefill_csv(tm: TranslationMemory, in_path: str, out_path: str,
+                min_score: float = 0.75) -> Dict[str, int]:
+    """Fill empty Vietnamese cells of a review CSV (Key,English,Vietnamese,Status);
+    the output keeps the input's BOM, if it had one"""
+    with open(in_path, encoding="utf-8", newline="") as f:
+        bom = f.read(1) == "\ufeff"
+        if not bom:
+            f.seek(0)
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or ["Key", "English", "Vietnamese", "Status"]
+        rows = list(reader)
+
+    counts = {"exact": 0, "fuzzy": 0, "segment": 0, "empty": 0}
+    for row in rows:
+        if (row.get("Vietnamese") or "").strip() or not (row.get("English") or "").strip():
+            continue
+        best: Optional[Dict] = next(iter(tm.suggest(row["English"], 1, min_score)), None)
+        if best is None:
+            counts["empty"] += 1
+            continue
+        row["Vietnamese"] = best["target"]
+        row["Status"] = ("TM exact" if best["kind"] == "exact"
+                         else f"TM {best['kind']} {best['score']:.0%}")
+        counts[best["kind"]] += 1
+
+    with open(out_path, "w", encoding="utf-8-sig" if bom else "utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(rows)
+    return counts
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    def option(flag, default):
+        if flag in args:
+            i = args.index(flag)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        return default
+
+    limit = int(option("-n", 5))
+    min_score = float(option("--min", 0.75 if args[:1] == ["prefill"] else 0.6))
+    if not args or args[0] not in ("suggest", "prefill", "stats") or \
+            (args[0] != "stats" and len(args) < 2):
+        print("Usage: python translation_memory.py suggest \"<text>\" [-n 5] [--min 0.6]")
+        print("       python translation_memory.py prefill <review.csv> [out.csv] [--min 0.75]")
+        print("       (default out.csv: <review>.prefilled.csv)")
+        print("       python translation_memory.py stats")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    tm = TranslationMemory.from_repo()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    command = args[0]
+    if command == "stats":
+        print(f"📚 {len(tm)} pairs, {len(tm.postings)} trigrams, {len(tm.phrases)} phrases "
+              f"(indexed in {load_ms:.1f} ms)")
+    elif command == "suggest":
+        started = time.perf_counter()
+        results = tm.suggest(args[1], limit, min_score)
+        query_ms = (time.perf_counter() - started) * 1000
+        if not results:
+            print(f"❌ No suggestions ({query_ms:.2f} ms)")
+            sys.exit(1)
+        print(f"💡 {len(results)} suggestion(s) in {query_ms:.2f} ms")
+        for match in results:
+            print(f"  [{match['kind']:7s} {match['score']:.0%}] {match['target']}")
+            if match["kind"] != "segment":
+                print(f"      ← {match['source']}  ({match['origin']})")
+    elif command == "prefill":
+        source = Path(args[1])
+        out_path = args[2] if len(args) > 2 else str(source.with_suffix(".prefilled.csv"))
+        counts = prefill_csv(tm, args[1], out_path, min_score)
+        print(f"✅ {out_path}: {counts['exact']} exact, {counts['fuzzy']} fuzzy, "
+              f"{counts['segment']} pre-translated, {counts['empty']} without suggestion")
+
+
+if __name__ == "__main__":
+    main()